@@ -51,24 +51,45 @@ demonstration purposes.  In production you would use a persistent
 database and implement authentication/authorization.  All endpoints
 return JSON responses so you can interact with the API using tools such
 as ``curl`` or ``httpie``.
+
+The in‑memory dictionaries are the working copy of the data and are
+local to the process that holds them.  Run the application as a single
+process (threads are fine); separate worker processes would each see
+their own copy and would not observe each other's writes.
 """
 
 from __future__ import annotations
 
+import bisect
+import hashlib
+import heapq
+import hmac
+import mimetypes
+import os
 import random
+import secrets
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
-from typing import Any, Dict, List, Optional, Tuple, Set
-
-from flask import Flask, jsonify, request, render_template_string, send_file, render_template, redirect, url_for
+from collections import Counter, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Callable, Dict, List, Optional, Tuple, Set
+from urllib.parse import quote
+
+from flask import Flask, g, jsonify, request, render_template_string, send_file, render_template, redirect, url_for
+from flask.json.provider import DefaultJSONProvider
+from werkzeug.security import check_password_hash, generate_password_hash
 from werkzeug.utils import secure_filename
-import io
 import smtplib
 from email.mime.text import MIMEText
-from sqlalchemy import or_
 
 # Added imports for database and user authentication
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import inspect, select, text
+from sqlalchemy.exc import DBAPIError, IntegrityError
 from flask_login import (
     LoginManager,
     UserMixin,
@@ -78,9 +99,38 @@ from flask_login import (
     current_user,
 )
 
+# orjson is an optional, faster JSON encoder.  When it is not installed the
+# stock Flask provider is used unchanged.
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # type: ignore
+
+
+class OrjsonProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes responses with orjson.
+
+    Datetimes are passed through to Flask's ``default`` hook so that the wire
+    format is identical to the stock provider; only the encoder changes.
+    """
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        option = orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_NON_STR_KEYS
+        if kwargs.get("sort_keys", self.sort_keys):
+            option |= orjson.OPT_SORT_KEYS
+        if kwargs.get("indent"):
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=kwargs.get("default", self.default), option=option).decode()
+
+    def loads(self, s: str | bytes, **kwargs: Any) -> Any:
+        return orjson.loads(s)
+
 
 app = Flask(__name__)
 app.config["JSON_SORT_KEYS"] = False
+if orjson is not None:
+    app.json = OrjsonProvider(app)
 
 # -----------------------------------------------------------------------------
 # Database configuration and initialization
@@ -92,6 +142,17 @@ app.config["JSON_SORT_KEYS"] = False
 app.config["SECRET_KEY"] = "change-this-secret-key"
 app.config["SQLALCHEMY_DATABASE_URI"] = "sqlite:///database.db"
 app.config["SQLALCHEMY_TRACK_MODIFICATIONS"] = False
+# Uploaded disclosure files are written below this folder (one sub‑folder per
+# property) and served from disk by the download endpoints.
+app.config["DISCLOSURE_FOLDER"] = os.path.join(app.instance_path, "disclosures")
+# Behind a front‑end server that supports ``X-Sendfile`` (Apache, or nginx
+# via ``X-Accel-Redirect`` mapping) set USE_X_SENDFILE=1 so downloads are
+# streamed by that server instead of the Python process.
+app.config["USE_X_SENDFILE"] = os.environ.get("USE_X_SENDFILE") == "1"
+# Profile pictures are written to this folder as ``<user id><ext>``; uploads
+# larger than ``MAX_AVATAR_BYTES`` are rejected.
+app.config["AVATAR_FOLDER"] = os.path.join(app.instance_path, "avatars")
+app.config["MAX_AVATAR_BYTES"] = 512 * 1024
 
 db = SQLAlchemy(app)
 login_manager = LoginManager(app)
@@ -100,17 +161,57 @@ login_manager.login_view = "login"
 
 # In‑memory data stores
 properties: Dict[str, Dict[str, Any]] = {}
+# Properties indexed by owning seller's user ID and by managing agent's
+# username; both hold the same dicts as ``properties``.
+properties_by_seller: Dict[int, Dict[str, Dict[str, Any]]] = {}
+properties_by_agent_username: Dict[str, Dict[str, Dict[str, Any]]] = {}
+# Properties indexed by the token used in their public links.
+properties_by_token: Dict[str, Dict[str, Any]] = {}
 showings: Dict[str, Dict[str, Any]] = {}
+# Showing lifecycle states, in the order reports list them
+_STATUSES: Tuple[str, ...] = ("pending", "approved", "declined")
+# Secondary index of ``showings`` keyed by property ID.  The inner dicts hold
+# the same showing objects, so status changes made through either mapping are
+# visible in both; only inserts need to go through ``_add_showing``.
+showings_by_property: Dict[str, Dict[str, Dict[str, Any]]] = {}
+# Start times of each property's showings as ``(start, id)`` pairs kept in
+# sorted order, so conflict checks only look at neighbours and listings can
+# be produced in chronological order without sorting.
+_showing_starts: Dict[str, List[Tuple[datetime, str]]] = {}
 feedback_store: Dict[str, List[Dict[str, Any]]] = {}
+# Number of showing feedback entries per property, kept alongside
+# ``feedback_store`` so reports need not walk every showing.
+feedback_count_by_property: Counter = Counter()
+# Blocked periods per property as non‑overlapping ``(start, end)`` pairs in
+# start order.
 blocked_times: Dict[str, List[Tuple[datetime, datetime]]] = {}
+# Revision of each property's busy times, bumped whenever a showing start or
+# blocked period is added, moved or removed.
+_schedule_rev: Counter = Counter()
+# Weekly slot availability from ``_week_grid`` keyed by property ID, stored
+# with the ``(first day, schedule revision)`` it was computed for.
+_week_grid_cache: Dict[str, Tuple[Tuple[date, int], bytes]] = {}
 tours: Dict[str, Dict[str, Any]] = {}
 
+# One lock per property guards check‑then‑write sequences on that property's
+# showings and activity log.  Readers hold it only long enough to copy the
+# entries they need and then work on the snapshot, so reports and dashboards
+# for one property never wait on writes to another.
+_prop_locks: Dict[str, threading.Lock] = defaultdict(threading.Lock)
+
 # Profile pictures uploaded by users.  Each entry maps a user ID to a dict
-# containing the original filename and the binary content of the uploaded
-# image.  This is kept in memory only for demonstration; a production
-# implementation should store files on disk or in a blob storage service.
+# containing the original filename, the path the image was saved to under
+# ``AVATAR_FOLDER`` (see ``save_avatar``) and a random version string that
+# changes with every upload and is used in the picture's URL.
 profile_pics: Dict[int, Dict[str, Any]] = {}
 
+# Contact details of registered users as ``(username, email)`` keyed by user
+# ID, plus a username → ID map, so notification paths need not query the
+# database.  Kept in step by ``_cache_user_contact`` whenever a user is
+# loaded, created or edited; ``_user_contact`` fills in misses.
+user_contacts: Dict[int, Tuple[str, Optional[str]]] = {}
+user_ids_by_username: Dict[str, int] = {}
+
 # Favorites store
 #
 # A mapping from user ID to a set of property IDs that the user has
@@ -119,6 +220,109 @@ profile_pics: Dict[int, Dict[str, Any]] = {}
 # agents may ignore this field.  This is an in‑memory store; in a
 # production system you would persist favourites in the database.
 favorites: Dict[int, set] = {}
+# Shared read‑only stand‑in for users without favourites
+_EMPTY: frozenset = frozenset()
+
+# Roles that manage listings and may use the dashboard and guest request pages
+_STAFF_ROLES: frozenset = frozenset({"seller", "listing_agent", "buyer_agent", "both_agent", "agent"})
+
+# Rendered public pages
+#
+# ``_PROP_REV`` is bumped whenever ``properties`` changes.  Pages that depend
+# only on the property list and the current year are cached together with the
+# ``(revision, year)`` they were rendered for and rebuilt when either moves.
+_PROP_REV = 0
+_page_cache: Dict[str, Tuple[Tuple[int, int], str]] = {}
+# Likewise ``_SHOWING_REV`` and ``_FAV_REV`` track showings and favourites.
+# Profile pages are cached per user together with the revisions and user
+# fields they were rendered from.
+_SHOWING_REV = 0
+_FAV_REV = 0
+_profile_cache: Dict[int, Tuple[Tuple[Any, ...], str]] = {}
+
+
+_by_name = itemgetter("name")
+
+
+def _add_property(prop: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Insert a property into ``properties`` and the owner and public token
+    indexes, and invalidate cached pages that list properties.
+    """
+    # Every property carries a name so listings can sort with ``_by_name``
+    prop.setdefault("name", "")
+    properties[prop["id"]] = prop
+    if prop.get("seller_id") is not None:
+        properties_by_seller.setdefault(prop["seller_id"], {})[prop["id"]] = prop
+    if prop.get("agent_username") is not None:
+        properties_by_agent_username.setdefault(prop["agent_username"], {})[prop["id"]] = prop
+    if prop.get("public_token") is not None:
+        properties_by_token[prop["public_token"]] = prop
+    _properties_changed()
+    return prop
+
+
+def _owned_properties(user: Any) -> Dict[str, Dict[str, Any]]:
+    """
+    Return the properties a user sells or manages, keyed by property ID.
+    Each property record may store ``seller_id`` or ``agent_username``
+    depending on how it was created, so both owner indexes are merged.
+    """
+    return {
+        **properties_by_agent_username.get(getattr(user, "username", None), {}),
+        **properties_by_seller.get(user.id, {}),
+    }
+
+
+def _manages_property(user: Any, prop: Dict[str, Any]) -> bool:
+    """Return whether ``user`` is the seller or managing agent of ``prop``."""
+    seller_id = prop.get("seller_id")
+    if seller_id and seller_id == user.id:
+        return True
+    agent_username = prop.get("agent_username")
+    return bool(agent_username) and agent_username == getattr(user, "username", None)
+
+
+def _properties_changed() -> None:
+    """Invalidate cached pages after ``properties`` has been modified."""
+    global _PROP_REV
+    _PROP_REV += 1
+
+
+def _showings_changed() -> None:
+    """Invalidate cached pages after a showing is added, moved or changes status."""
+    global _SHOWING_REV
+    _SHOWING_REV += 1
+
+
+_year = 0
+_year_ends_at = 0.0
+
+
+def _current_year() -> int:
+    """
+    Return the current (local) year for page footers.  The value is computed
+    once and only recomputed after the year has rolled over.
+    """
+    global _year, _year_ends_at
+    if time.time() >= _year_ends_at:
+        _year = datetime.now().year
+        _year_ends_at = datetime(_year + 1, 1, 1).timestamp()
+    return _year
+
+
+def _cached_page(name: str, current_year: int, render: Callable[[], str]) -> str:
+    """
+    Return the cached HTML for ``name`` if it was rendered for the current
+    property revision and year, otherwise call ``render`` and cache it.
+    """
+    key = (_PROP_REV, current_year)
+    hit = _page_cache.get(name)
+    if hit is not None and hit[0] == key:
+        return hit[1]
+    html = render()
+    _page_cache[name] = (key, html)
+    return html
 
 # -----------------------------------------------------------------------------
 # Database models
@@ -135,6 +339,8 @@ favorites: Dict[int, set] = {}
 class User(db.Model, UserMixin):
     id = db.Column(db.Integer, primary_key=True)
     username = db.Column(db.String(80), unique=True, nullable=False)
+    # Salted password hash (see ``hash_password``).  Accounts created before
+    # hashing was introduced hold the plain password until their next login.
     password = db.Column(db.String(120), nullable=False)
     # Role distinguishes between agents and sellers. Agents can create and manage
     # properties, while sellers can approve showings and disclosures for their own
@@ -143,7 +349,7 @@ class User(db.Model, UserMixin):
 
     # Additional profile fields
     # Email address for contact.  Required for agents and sellers; optional for other roles.
-    email = db.Column(db.String(200))
+    email = db.Column(db.String(200), index=True)
     # Mailing or contact address.  Optional.
     address = db.Column(db.String(200))
     # License number for agents (both listing and buyer agents).  Optional; sellers
@@ -182,22 +388,126 @@ class ShowingModel(db.Model):
 
     property = db.relationship("PropertyModel", backref="showings")
 
+
+# Fields shared by in‑memory showing dicts and ``ShowingModel`` rows
+_SHOWING_COLUMNS = (
+    "id", "property_id", "client_name", "client_phone", "client_email",
+    "scheduled_at", "status", "lockbox_code", "code_expires_at",
+)
+
+
+def _showing_model(showing: Dict[str, Any]) -> ShowingModel:
+    """Build the database row that mirrors an in‑memory showing dict."""
+    return ShowingModel(**{col: showing.get(col) for col in _SHOWING_COLUMNS})
+
 # -----------------------------------------------------------------------------
 # Helper to load database records into in‑memory structures
 
+def _add_showing(showing: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert a showing into ``showings`` and the per‑property indexes."""
+    # Start times are stored as datetimes so readers never need to parse them
+    if not isinstance(showing["scheduled_at"], datetime):
+        showing["scheduled_at"] = datetime.fromisoformat(str(showing["scheduled_at"]))
+    showings[showing["id"]] = showing
+    showings_by_property.setdefault(showing["property_id"], {})[showing["id"]] = showing
+    _index_showing_start(showing)
+    _showings_changed()
+    return showing
+
+
+def _index_showing_start(showing: Dict[str, Any]) -> None:
+    """Add a showing's start time to the sorted start‑time index."""
+    starts = _showing_starts.setdefault(showing["property_id"], [])
+    bisect.insort(starts, (showing["scheduled_at"], showing["id"]))
+    _schedule_rev[showing["property_id"]] += 1
+
+
+def _unindex_showing_start(showing: Dict[str, Any]) -> None:
+    """Remove a showing's start time from the sorted start‑time index."""
+    starts = _showing_starts.get(showing["property_id"], [])
+    key = (showing["scheduled_at"], showing["id"])
+    i = bisect.bisect_left(starts, key)
+    if i < len(starts) and starts[i] == key:
+        del starts[i]
+        _schedule_rev[showing["property_id"]] += 1
+
+
+def _move_showing(showing: Dict[str, Any], start: datetime) -> None:
+    """Change a showing's start time, keeping the start‑time index sorted."""
+    _unindex_showing_start(showing)
+    showing["scheduled_at"] = start
+    _index_showing_start(showing)
+    _showings_changed()
+
+
+def _cache_user_contact(user: "User") -> None:
+    """Record a user's current contact details in ``user_contacts``."""
+    user_contacts[user.id] = (user.username, user.email)
+    user_ids_by_username[user.username] = user.id
+
+
+def _user_contact(
+    user_id: Optional[int] = None, username: Optional[str] = None
+) -> Optional[Tuple[str, Optional[str]]]:
+    """
+    Return ``(username, email)`` for the user with the given ID or username,
+    from ``user_contacts`` when cached and otherwise from the database.
+    """
+    if user_id is None:
+        user_id = user_ids_by_username.get(username)
+    contact = user_contacts.get(user_id) if user_id is not None else None
+    if contact is None:
+        if user_id is not None:
+            user = db.session.get(User, user_id)
+        else:
+            user = User.query.filter_by(username=username).first()
+        if user is None:
+            return None
+        _cache_user_contact(user)
+        contact = user_contacts[user.id]
+    return contact
+
+
+# Rows fetched per round trip while loading the database at startup
+_LOAD_BATCH = 1000
+
+
 def load_db_into_memory() -> None:
     """Load persisted properties and showings from the database into the in‑memory dictionaries.
 
     This function queries the PropertyModel and ShowingModel tables and populates
     the ``properties`` and ``showings`` dictionaries, allowing the rest of the
     application to operate on the same in‑memory data structures it used before
-    database support was added.
+    database support was added.  Rows are streamed in batches of
+    ``_LOAD_BATCH`` so only the resulting dicts, not every ORM object at
+    once, are held in memory.
     """
     # Clear existing in‑memory data
     properties.clear()
+    properties_by_seller.clear()
+    properties_by_agent_username.clear()
+    properties_by_token.clear()
     showings.clear()
-    for prop in PropertyModel.query.all():
-        properties[prop.id] = {
+    showings_by_property.clear()
+    _showing_starts.clear()
+    _week_grid_cache.clear()
+    _prop_subject.cache_clear()
+    user_contacts.clear()
+    user_ids_by_username.clear()
+    profile_pics.clear()
+    for user in db.session.scalars(select(User).execution_options(yield_per=_LOAD_BATCH)):
+        _cache_user_contact(user)
+        # Re‑register profile pictures kept in AVATAR_FOLDER across restarts
+        if user.avatar_filename:
+            path = _avatar_path(user.id, user.avatar_filename)
+            if os.path.exists(path):
+                profile_pics[user.id] = {
+                    "filename": user.avatar_filename,
+                    "path": path,
+                    "version": secrets.token_hex(6),
+                }
+    for prop in db.session.scalars(select(PropertyModel).execution_options(yield_per=_LOAD_BATCH)):
+        _add_property({
             "id": prop.id,
             "name": prop.name,
             "address": prop.address,
@@ -210,9 +520,9 @@ def load_db_into_memory() -> None:
             "agent_email": prop.agent_email,
             "auto_approve_showings": prop.auto_approve_showings,
             "requires_disclosure_approval": prop.requires_disclosure_approval,
-        }
-    for sh in ShowingModel.query.all():
-        showings[sh.id] = {
+        })
+    for sh in db.session.scalars(select(ShowingModel).execution_options(yield_per=_LOAD_BATCH)):
+        _add_showing({
             "id": sh.id,
             "property_id": sh.property_id,
             "client_name": sh.client_name,
@@ -223,7 +533,81 @@ def load_db_into_memory() -> None:
             "lockbox_code": sh.lockbox_code,
             "code_expires_at": sh.code_expires_at,
             "created_at": sh.created_at,
-        }
+        })
+    _properties_changed()
+
+
+def _sql_literal(value: Any) -> str:
+    """Render a scalar column default as an SQL literal for ``ALTER TABLE``."""
+    if isinstance(value, bool):
+        return "1" if value else "0"
+    if isinstance(value, (int, float)):
+        return str(value)
+    return "'" + str(value).replace("'", "''") + "'"
+
+
+def _schema_fingerprint() -> str:
+    """Hash the table and column definitions of the models."""
+    parts = []
+    for table in db.metadata.sorted_tables:
+        for column in table.columns:
+            parts.append("{}.{}:{}".format(table.name, column.name, column.type))
+    return hashlib.sha1("|".join(parts).encode()).hexdigest()
+
+
+def upgrade_schema() -> None:
+    """
+    Bring the database schema up to date with the models without losing data.
+
+    Missing tables are created, and columns that a model defines but its
+    existing table lacks are added with ``ALTER TABLE ... ADD COLUMN``.
+    Scalar Python defaults become SQL defaults so existing rows receive them.
+    Only additive changes are handled; renames, type changes and new indexes
+    on existing tables need a manual migration.
+
+    A fingerprint of the models is kept in the ``schema_version`` table, and
+    the reflection is skipped entirely when it matches.
+    """
+    fingerprint = _schema_fingerprint()
+    try:
+        with db.engine.connect() as conn:
+            current = conn.execute(text("SELECT v FROM schema_version WHERE id = 1")).scalar()
+    except DBAPIError:
+        current = None
+    if current == fingerprint:
+        return
+    db.create_all()
+    inspector = inspect(db.engine)
+    with db.engine.begin() as conn:
+        for table in db.metadata.sorted_tables:
+            existing = {col["name"] for col in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing:
+                    continue
+                ddl = 'ALTER TABLE "{}" ADD COLUMN "{}" {}'.format(
+                    table.name, column.name, column.type.compile(dialect=db.engine.dialect)
+                )
+                default = column.default
+                if default is not None and default.is_scalar:
+                    ddl += " DEFAULT " + _sql_literal(default.arg)
+                    if not column.nullable:
+                        ddl += " NOT NULL"
+                conn.execute(text(ddl))
+                print("Added column {}.{} to the database schema.".format(table.name, column.name))
+        conn.execute(text("CREATE TABLE IF NOT EXISTS schema_version (id INTEGER PRIMARY KEY, v VARCHAR(64) NOT NULL)"))
+        conn.execute(text("DELETE FROM schema_version"))
+        conn.execute(text("INSERT INTO schema_version (id, v) VALUES (1, :v)"), {"v": fingerprint})
+
+@app.before_request
+def _stamp_request_time() -> None:
+    """
+    Read the clock once per request and share it via ``g.now``.
+
+    The value is UTC but kept naive to match the timestamps already stored
+    on showings and in the database.
+    """
+    g.now = datetime.now(timezone.utc).replace(tzinfo=None)
+
 
 # -----------------------------------------------------------------------------
 # User loader for Flask‑Login
@@ -248,15 +632,19 @@ def load_user(user_id: str) -> Optional[User]:
 # Disclosure management and activity logging
 #
 # The following two in‑memory structures hold uploaded disclosure files and
-# records of activity for each property.  Disclosure files are stored as
-# byte streams keyed by property ID and filename.  The activity log is a
+# records of activity for each property.  Disclosure files are saved under
+# ``DISCLOSURE_FOLDER`` and indexed here by property ID and filename, mapping
+# to metadata only: the ``path`` of the file on disk, its ``size`` in bytes
+# and the ``sha256`` hex digest of its contents.  The activity log is a
 # chronological list of events (such as showing requests, approvals,
 # declines, reschedules, feedback submissions and disclosure uploads or
 # downloads) for each property.  These structures are kept in memory for
 # demonstration purposes; a real system would persist them in a database
 # or external storage.
-disclosures: Dict[str, Dict[str, bytes]] = {}
+disclosures: Dict[str, Dict[str, Dict[str, Any]]] = {}
 activity_logs: Dict[str, List[Dict[str, Any]]] = {}
+# Running per‑type totals of ``activity_logs`` for property reports.
+event_counts_by_property: Dict[str, Counter] = defaultdict(Counter)
 
 # Packages and sharing
 # -----------------------------------------------------------------------------
@@ -267,6 +655,39 @@ activity_logs: Dict[str, List[Dict[str, Any]]] = {}
 # definitions and shares are stored in the following in‑memory structures.
 packages: Dict[str, Dict[str, Any]] = {}
 package_shares: Dict[str, Dict[str, Any]] = {}
+# Packages indexed by property ID, holding the same dicts as ``packages``.
+packages_by_property: Dict[str, Dict[str, Dict[str, Any]]] = {}
+# Shares indexed by property ID, holding the same dicts as ``package_shares``.
+shares_by_property: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+
+def _add_package(package: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert a package into ``packages`` and the per‑property index."""
+    packages[package["id"]] = package
+    packages_by_property.setdefault(package["property_id"], {})[package["id"]] = package
+    return package
+
+
+def _add_share(share: Dict[str, Any]) -> Dict[str, Any]:
+    """Insert a share into ``package_shares`` and the per‑property index."""
+    package_shares[share["id"]] = share
+    shares_by_property.setdefault(share["property_id"], {})[share["id"]] = share
+    return share
+
+
+def _claim_share_approval(share: Dict[str, Any]) -> bool:
+    """
+    Mark a share as approved and report whether this call did it.
+
+    The check and the write happen under the property lock, so when two
+    requests approve the same share at once only one of them gets ``True``
+    and sends the approval notifications.
+    """
+    with _prop_locks[share.get("property_id")]:
+        if share.get("approved"):
+            return False
+        share["approved"] = True
+        return True
 
 # Disclosure feedback storage
 # -----------------------------------------------------------------------------
@@ -274,6 +695,8 @@ package_shares: Dict[str, Dict[str, Any]] = {}
 # dictionary stores feedback entries keyed by share ID.  Each entry contains
 # a list of feedback objects with rating, comment and creation timestamp.
 disclosure_feedback_store: Dict[str, List[Dict[str, Any]]] = {}
+# Number of disclosure feedback entries per property.
+disclosure_feedback_count_by_property: Counter = Counter()
 
 # Offers management
 # -----------------------------------------------------------------------------
@@ -281,6 +704,9 @@ disclosure_feedback_store: Dict[str, List[Dict[str, Any]]] = {}
 # Each offer includes an ID, the buyer's name, price and an optional set of
 # terms.  Offers can be listed and created via dedicated endpoints.
 offers: Dict[str, List[Dict[str, Any]]] = {}
+# Last computed ``offers_report`` per property; dropped whenever an offer is
+# added for that property.
+_offers_report_cache: Dict[str, Dict[str, Any]] = {}
 
 
 def log_event(property_id: str, event_type: str, details: Dict[str, Any]) -> None:
@@ -300,7 +726,99 @@ def log_event(property_id: str, event_type: str, details: Dict[str, Any]) -> Non
         "type": event_type,
         "details": details,
     }
-    activity_logs.setdefault(property_id, []).insert(0, entry)
+    with _prop_locks[property_id]:
+        activity_logs.setdefault(property_id, []).insert(0, entry)
+        event_counts_by_property[property_id][event_type] += 1
+
+
+@lru_cache(maxsize=4096)
+def _secure(name: str) -> str:
+    """Return ``secure_filename(name)``, memoised for repeated filenames."""
+    return secure_filename(name)
+
+
+# Uploads are copied to disk in chunks of this many bytes, so memory use per
+# upload stays constant however large the file is.
+_UPLOAD_CHUNK = 64 * 1024
+
+
+def save_disclosure(property_id: str, filename: str, file: Any) -> str:
+    """
+    Save an uploaded disclosure file to disk and register it for the
+    property.  Returns the path the file was written to.  The upload is
+    streamed to a temporary file that replaces any existing file only once
+    complete, so concurrent downloads never see a partial file.  The size
+    and SHA‑256 digest are computed from the chunks as they are written.
+
+    :param property_id: ID of the property the disclosure belongs to.
+    :param filename: Sanitised filename to store the file under.
+    :param file: The uploaded ``FileStorage`` object.
+    """
+    folder = os.path.join(app.config["DISCLOSURE_FOLDER"], property_id)
+    os.makedirs(folder, exist_ok=True)
+    path = os.path.join(folder, filename)
+    tmp_path = path + ".part"
+    digest = hashlib.sha256()
+    size = 0
+    with open(tmp_path, "wb") as out:
+        while True:
+            chunk = file.stream.read(_UPLOAD_CHUNK)
+            if not chunk:
+                break
+            digest.update(chunk)
+            out.write(chunk)
+            size += len(chunk)
+    os.replace(tmp_path, path)
+    disclosures.setdefault(property_id, {})[filename] = {
+        "path": path,
+        "size": size,
+        "sha256": digest.hexdigest(),
+    }
+    return path
+
+
+def _avatar_path(user_id: int, filename: str) -> str:
+    """Return where a user's profile picture is stored, keyed by user ID and extension."""
+    return os.path.join(app.config["AVATAR_FOLDER"], f"{user_id}{os.path.splitext(filename)[1].lower()}")
+
+
+def save_avatar(user_id: int, filename: str, file: Any) -> bool:
+    """
+    Save an uploaded profile picture to disk and register it in
+    ``profile_pics``.  Returns ``False``, keeping any previous picture, if
+    the upload is larger than ``MAX_AVATAR_BYTES``; copying stops as soon as
+    the limit is passed.
+
+    :param user_id: ID of the user the picture belongs to.
+    :param filename: Sanitised original filename (used for its extension).
+    :param file: The uploaded ``FileStorage`` object.
+    """
+    os.makedirs(app.config["AVATAR_FOLDER"], exist_ok=True)
+    path = _avatar_path(user_id, filename)
+    tmp_path = path + ".part"
+    limit = app.config["MAX_AVATAR_BYTES"]
+    size = 0
+    with open(tmp_path, "wb") as out:
+        while True:
+            chunk = file.stream.read(_UPLOAD_CHUNK)
+            if not chunk:
+                break
+            size += len(chunk)
+            if size > limit:
+                break
+            out.write(chunk)
+    if size > limit:
+        os.remove(tmp_path)
+        return False
+    os.replace(tmp_path, path)
+    previous = profile_pics.get(user_id)
+    if previous and previous["path"] != path:
+        try:
+            os.remove(previous["path"])
+        except OSError:
+            pass
+    profile_pics[user_id] = {"filename": filename, "path": path, "version": secrets.token_hex(6)}
+    return True
 
 
 def generate_lockbox_code() -> str:
@@ -320,8 +838,10 @@ def generate_lockbox_code() -> str:
 # the console instead of attempting to send it.
 try:
     from twilio.rest import Client  # type: ignore
+    from twilio.http.http_client import TwilioHttpClient  # type: ignore
 except Exception:
     Client = None  # type: ignore
+    TwilioHttpClient = None  # type: ignore
 
 # Holds Twilio credentials and default "from" number.  Administrators should
 # populate these values via the `/admin/twilio` endpoint.
@@ -331,6 +851,26 @@ twilio_config: Dict[str, Optional[str]] = {
     "from_number": None,
 }
 
+# Notification connections are kept per thread: each delivery worker holds
+# its own Twilio client and SMTP session, so the TCP and TLS handshakes are
+# paid once per worker rather than once per batch, and no locking is needed.
+_tls = threading.local()
+# Seconds to wait on Twilio or the SMTP server before giving up, so a hung
+# provider only ties up one delivery worker for a bounded time.
+_NOTIFY_TIMEOUT = 10
+
+
+def _twilio_client(sid: str, token: str) -> Any:
+    """
+    Return this thread's Twilio client, creating a new one when none exists
+    yet or the credentials have changed since it was created.
+    """
+    cached = getattr(_tls, "twilio", None)
+    if cached is None or cached[0] != (sid, token):
+        http_client = TwilioHttpClient(timeout=_NOTIFY_TIMEOUT)
+        cached = _tls.twilio = ((sid, token), Client(sid, token, http_client=http_client))
+    return cached[1]
+
 def send_sms(to_number: str, message: str) -> None:
     """
     Send an SMS message using Twilio.  If the Twilio client or configuration
@@ -339,22 +879,40 @@ def send_sms(to_number: str, message: str) -> None:
     :param to_number: Destination phone number (in E.164 format).
     :param message: Text message to send.
     """
+    send_bulk_sms([(to_number, message)])
+
+
+def send_bulk_sms(messages: List[Tuple[str, str]]) -> None:
+    """
+    Send several SMS messages through a single Twilio client so the HTTP
+    connection is reused across recipients.  Falls back to printing each
+    message when Twilio is unavailable, like ``send_sms``.
+
+    :param messages: ``(to_number, message)`` pairs.
+    """
     if Client is None:
         # Twilio is not installed; log instead of sending
-        print(f"[SMS not sent] To {to_number}: {message}")
+        for to_number, message in messages:
+            print(f"[SMS not sent] To {to_number}: {message}")
         return
     sid = twilio_config.get("account_sid")
     token = twilio_config.get("auth_token")
     from_number = twilio_config.get("from_number")
     if not sid or not token or not from_number:
         # Missing configuration; log instead of sending
-        print(f"[SMS not sent] To {to_number}: {message} (Twilio config incomplete)")
+        for to_number, message in messages:
+            print(f"[SMS not sent] To {to_number}: {message} (Twilio config incomplete)")
         return
     try:
-        client = Client(sid, token)
-        client.messages.create(body=message, from_=from_number, to=to_number)
+        client = _twilio_client(sid, token)
     except Exception as e:  # pragma: no cover - network errors are non-deterministic
-        print(f"[SMS error] Could not send to {to_number}: {e}")
+        print(f"[SMS error] Could not create Twilio client: {e}")
+        return
+    for to_number, message in messages:
+        try:
+            client.messages.create(body=message, from_=from_number, to=to_number)
+        except Exception as e:  # pragma: no cover - network errors are non-deterministic
+            print(f"[SMS error] Could not send to {to_number}: {e}")
 
 
 # -----------------------------------------------------------------------------
@@ -376,6 +934,48 @@ email_config: Dict[str, Optional[str]] = {
     "use_tls": "true",  # store as string for simplicity
 }
 
+
+def _close_smtp() -> None:
+    """Close and forget this thread's SMTP session, if any."""
+    cached = getattr(_tls, "smtp", None)
+    _tls.smtp = None
+    if cached is not None:
+        try:
+            cached[1].quit()
+        except Exception:
+            pass
+
+
+def _smtp_session(key: Tuple[Any, ...], fresh: bool = False) -> smtplib.SMTP:
+    """
+    Return this thread's SMTP session for ``key``, connecting, starting TLS
+    and logging in only when there is no open session for the same
+    settings.
+
+    :param key: ``(host, port, use_tls, username, password)``.
+    :param fresh: Discard any existing session and reconnect.
+    """
+    cached = getattr(_tls, "smtp", None)
+    if cached is not None and (fresh or cached[0] != key):
+        _close_smtp()
+        cached = None
+    if cached is None:
+        server_host, port_num, use_tls, user, pwd = key
+        smtp = smtplib.SMTP(server_host, port_num, timeout=_NOTIFY_TIMEOUT)
+        # use TLS if configured
+        if use_tls:
+            try:
+                smtp.starttls()
+            except Exception:
+                pass
+        if user and pwd:
+            try:
+                smtp.login(user, pwd)
+            except Exception:
+                pass
+        cached = _tls.smtp = (key, smtp)
+    return cached[1]
+
 def send_email(to_email: str, subject: str, message: str) -> None:
     """
     Send an email notification using the configured SMTP server.  If the
@@ -385,40 +985,253 @@ def send_email(to_email: str, subject: str, message: str) -> None:
     :param subject: Email subject.
     :param message: Plain‑text email body.
     """
+    send_bulk_email([(to_email, subject, message)])
+
+
+def send_bulk_email(messages: List[Tuple[str, str, str]]) -> None:
+    """
+    Send several emails over this thread's SMTP session, so the connection,
+    STARTTLS handshake and login happen once per worker instead of once per
+    recipient.  Falls back to printing like ``send_email``.
+
+    :param messages: ``(to_email, subject, message)`` tuples.
+    """
     server_host = email_config.get("smtp_server")
     server_port = email_config.get("smtp_port")
     from_addr = email_config.get("from_email")
     if not server_host or not server_port or not from_addr:
-        print(f"[Email not sent] To {to_email}: {subject} - {message} (email config incomplete)")
+        for to_email, subject, message in messages:
+            print(f"[Email not sent] To {to_email}: {subject} - {message} (email config incomplete)")
         return
     try:
         port_num = int(server_port)
     except Exception:
         print(f"[Email not sent] Invalid SMTP port: {server_port}")
         return
-    msg = MIMEText(message)
-    msg["Subject"] = subject
-    msg["From"] = from_addr
-    msg["To"] = to_email
+    key = (
+        server_host,
+        port_num,
+        (email_config.get("use_tls") or "false").lower() == "true",
+        email_config.get("smtp_username"),
+        email_config.get("smtp_password"),
+    )
     try:
-        with smtplib.SMTP(server_host, port_num) as smtp:
-            # use TLS if configured
-            use_tls = (email_config.get("use_tls") or "false").lower() == "true"
-            if use_tls:
-                try:
-                    smtp.starttls()
-                except Exception:
-                    pass
-            user = email_config.get("smtp_username")
-            pwd = email_config.get("smtp_password")
-            if user and pwd:
+        smtp = _smtp_session(key)
+        for to_email, subject, message in messages:
+            msg = MIMEText(message)
+            msg["Subject"] = subject
+            msg["From"] = from_addr
+            msg["To"] = to_email
+            try:
                 try:
-                    smtp.login(user, pwd)
-                except Exception:
-                    pass
-            smtp.send_message(msg)
+                    smtp.send_message(msg)
+                except smtplib.SMTPServerDisconnected:
+                    # The server dropped the idle session; reconnect once
+                    smtp = _smtp_session(key, fresh=True)
+                    smtp.send_message(msg)
+            except Exception as e:
+                print(f"[Email error] Could not send to {to_email}: {e}")
     except Exception as e:
-        print(f"[Email error] Could not send to {to_email}: {e}")
+        _close_smtp()
+        recipients = ", ".join(to for to, _, _ in messages)
+        print(f"[Email error] Could not send to {recipients}: {e}")
+
+
+# -----------------------------------------------------------------------------
+# Background notification delivery
+#
+# Each Twilio or SMTP call costs at least one network round trip, so request
+# handlers queue notifications on small thread pools and return as soon as
+# the in‑memory stores are updated.  SMS and email use separate pools so a
+# slow provider on one channel does not hold up the other.  Delivery errors
+# are already caught and logged by ``send_sms`` and ``send_email``.
+_sms_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="sms")
+_email_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix="email")
+
+
+def notify_sms(to_number: str, message: str) -> None:
+    """Queue an SMS for delivery by ``send_sms`` on the SMS pool."""
+    _sms_pool.submit(send_sms, to_number, message)
+
+
+def notify_email(to_email: str, subject: str, message: str) -> None:
+    """Queue an email for delivery by ``send_email`` on the email pool."""
+    _email_pool.submit(send_email, to_email, subject, message)
+
+
+def notify_bulk(sms: List[Tuple[str, str]], emails: List[Tuple[str, str, str]]) -> None:
+    """
+    Queue a batch of notifications as at most one SMS task and one email
+    task, so each batch shares a Twilio client and an SMTP session.
+
+    :param sms: ``(to_number, message)`` pairs.
+    :param emails: ``(to_email, subject, message)`` tuples.
+    """
+    if sms:
+        _sms_pool.submit(send_bulk_sms, sms)
+    if emails:
+        _email_pool.submit(send_bulk_email, emails)
+
+
+# Property contact fields notified by SMS and by email respectively.
+_STAKEHOLDER_PHONES = ("seller_phone", "agent_phone")
+_STAKEHOLDER_EMAILS = ("seller_email", "agent_email")
+
+
+def _stakeholder_batch(
+    prop: Dict[str, Any], subject: str, message: str
+) -> Tuple[List[Tuple[str, str]], List[Tuple[str, str, str]]]:
+    """
+    Build the SMS and email batches that notify the seller and listing agent
+    of a property.  Callers may append further recipients before passing the
+    batches to ``notify_bulk``.
+
+    :param prop: The property dictionary holding the contact fields.
+    :param subject: Email subject (unused for SMS).
+    :param message: Message body sent by SMS and email.
+    """
+    sms = [(prop[f], message) for f in _STAKEHOLDER_PHONES if prop.get(f)]
+    emails = [(prop[f], subject, message) for f in _STAKEHOLDER_EMAILS if prop.get(f)]
+    return sms, emails
+
+
+def _notify_stakeholders(prop: Dict[str, Any], subject: str, message: str) -> None:
+    """
+    Notify the seller and listing agent of a property using whichever phone
+    numbers and email addresses are set on the property record.
+
+    :param prop: The property dictionary holding the contact fields.
+    :param subject: Email subject (unused for SMS).
+    :param message: Message body sent by SMS and email.
+    """
+    notify_bulk(*_stakeholder_batch(prop, subject, message))
+
+
+def _notify_buyer(
+    phone: Optional[str],
+    email: Optional[str],
+    subject: str,
+    message: str,
+    email_message: Optional[str] = None,
+) -> None:
+    """
+    Queue a notification to a buyer by SMS and email, skipping whichever
+    contact is missing.
+
+    :param phone: Buyer phone number, if known.
+    :param email: Buyer email address, if known.
+    :param subject: Email subject (unused for SMS).
+    :param message: Message body sent by SMS, and by email unless
+        ``email_message`` is given.
+    :param email_message: Separate email body, if it differs from the SMS.
+    """
+    notify_bulk(
+        [(phone, message)] if phone else [],
+        [(email, subject, email_message or message)] if email else [],
+    )
+
+
+# -----------------------------------------------------------------------------
+# Notification message templates
+#
+# SMS/email bodies and subjects used by the showing and disclosure endpoints.
+# Each template is a bound ``str.format`` method so handlers only fill in the
+# values; timestamps are formatted once per request with ``_WHEN_FORMAT``.
+_WHEN_FORMAT = "%Y-%m-%d %H:%M"
+
+_SMS_REQUEST_RECEIVED = "Your showing request for {prop} on {when} has been received and is pending approval.".format
+_EMAIL_REQUEST_RECEIVED = "Hello {name},\n\nYour showing request for {prop} on {when} has been received and is pending approval.\n\nThank you.".format
+_NOTIFY_REQUESTED = (
+    "New showing request for {prop}: {name} has requested to view the property on {when}.\n"
+    "Use your dashboard or the API to approve, decline or reschedule this showing.\n"
+    "Showing ID: {showing_id}"
+).format
+_SUBJ_REQUESTED = "New showing request for {prop}".format
+
+_SMS_APPROVED = "Your showing for {prop} at {when} has been approved. Lockbox code: {code} (expires {exp}).".format
+_EMAIL_APPROVED = "Hello {name},\n\nYour showing for {prop} at {when} has been approved.\nYour lockbox code is {code} and will expire at {exp}.\n\nThank you.".format
+_NOTIFY_APPROVED = (
+    "Showing for {prop} on {when} has been approved.\n"
+    "Buyer: {name}. Lockbox code: {code} (expires {exp}).\n"
+    "Showing ID: {showing_id}"
+).format
+_SUBJ_APPROVED = "Showing approved for {prop}".format
+_NOTIFY_AUTO_APPROVED = (
+    "Showing for {prop} on {when} was automatically approved.\n"
+    "Buyer: {name}. Lockbox code: {code} (expires {exp}).\n"
+    "Showing ID: {showing_id}"
+).format
+_SUBJ_AUTO_APPROVED = "Showing auto‑approved for {prop}".format
+
+_SMS_DECLINED = "Your showing request for {prop} on {when} has been declined.".format
+_EMAIL_DECLINED = "Hello {name},\n\nYour showing request for {prop} on {when} has been declined.\n\nThank you.".format
+_NOTIFY_DECLINED = (
+    "Showing for {prop} on {when} has been declined.\n"
+    "Buyer: {name}. Showing ID: {showing_id}"
+).format
+_SUBJ_DECLINED = "Showing declined for {prop}".format
+
+_SMS_RESCHEDULED_CODE = "Your showing for {prop} has been rescheduled to {when}. New lockbox code: {code} (expires {exp}).".format
+_EMAIL_RESCHEDULED_CODE = "Hello {name},\n\nYour showing for {prop} has been rescheduled to {when}.\nYour new lockbox code is {code} and will expire at {exp}.\n\nThank you.".format
+_SMS_RESCHEDULED_PENDING = "Your showing request for {prop} has been rescheduled to {when} and is pending approval.".format
+_EMAIL_RESCHEDULED_PENDING = "Hello {name},\n\nYour showing request for {prop} has been rescheduled to {when} and is pending approval.\n\nThank you.".format
+_NOTIFY_RESCHEDULED = (
+    "Showing for {prop} has been rescheduled to {when}.\n"
+    "Buyer: {name}. Showing ID: {showing_id}"
+).format
+_SUBJ_RESCHEDULED = "Showing rescheduled for {prop}".format
+
+_NOTIFY_FEEDBACK = (
+    "New feedback received for showing ID {showing_id} on {prop}.\n"
+    "Rating: {rating}, Comment: {comment}"
+).format
+_SUBJ_FEEDBACK = "Showing feedback for {prop}".format
+
+
+@lru_cache(maxsize=1024)
+def _prop_subject(property_id: str, template: Callable[..., str]) -> str:
+    """
+    Render a seller/agent subject line that depends only on the property.
+
+    Subjects are identical for every showing of a property, so they are
+    formatted once and reused.  The cache is cleared whenever properties are
+    reloaded from the database.
+    """
+    prop = properties.get(property_id, {})
+    return template(prop=prop.get("name", property_id))
+
+_NOTIFY_SHARE_AUTO = "Disclosure package '{pkg}' for {prop} was automatically shared with buyer {buyer}. (Share ID: {share_id})".format
+_SUBJ_SHARE_AUTO = "Disclosure package shared for {prop}".format
+_NOTIFY_SHARE_REQUESTED = (
+    "Buyer {buyer} has requested access to disclosure package '{pkg}' for {prop}.\n"
+    "Approve the share via POST /share/{share_id}/approve."
+).format
+_SUBJ_SHARE_REQUESTED = "Disclosure access request for {prop}".format
+_BUYER_SHARE_GRANTED = (
+    "You have been granted access to disclosure package '{pkg}' for {prop}.\n"
+    "Use your share ID {share_id} to download the files."
+).format
+_BUYER_SUBJ_SHARE_GRANTED = "Disclosure package available for {prop}".format
+_BUYER_SHARE_PENDING = (
+    "Your request to access disclosure package '{pkg}' for {prop} has been received and is pending approval.\n"
+    "You will be notified when access is granted."
+).format
+_BUYER_SUBJ_SHARE_PENDING = "Disclosure access request received for {prop}".format
+_NOTIFY_SHARE_APPROVED = (
+    "Disclosure package share (ID: {share_id}) for {prop} has been approved.\n"
+    "Buyer: {buyer}."
+).format
+_SUBJ_SHARE_APPROVED = "Disclosure share approved for {prop}".format
+_BUYER_SHARE_APPROVED = (
+    "Your request to access disclosure package for {prop} has been approved.\n"
+    "Use your share ID {share_id} to download the files."
+).format
+_BUYER_SUBJ_SHARE_APPROVED = "Disclosure package approved for {prop}".format
+_NOTIFY_SHARE_FEEDBACK = (
+    "New disclosure feedback received for {prop} (share ID {share_id}).\n"
+    "Rating: {rating}, Comment: {comment}"
+).format
+_SUBJ_SHARE_FEEDBACK = "Disclosure feedback for {prop}".format
 
 
 def is_time_blocked(property_id: str, start: datetime, end: datetime) -> bool:
@@ -426,10 +1239,58 @@ def is_time_blocked(property_id: str, start: datetime, end: datetime) -> bool:
     Check whether the given time range overlaps any blocked period for the
     property.
     """
-    for b_start, b_end in blocked_times.get(property_id, []):
-        if start < b_end and end > b_start:
-            return True
-    return False
+    # Blocks never overlap and are kept sorted (see ``_add_block``), so the
+    # last block starting before ``end`` is the only one that can reach
+    # past ``start``.
+    blocks = blocked_times.get(property_id, [])
+    i = bisect.bisect_left(blocks, (end,))
+    return i > 0 and blocks[i - 1][1] > start
+
+
+def _add_block(property_id: str, start: datetime, end: datetime) -> None:
+    """
+    Insert a blocked period, keeping the property's blocks sorted by start.
+    Callers must first check with ``is_time_blocked`` that it overlaps no
+    existing block.  A block that touches its neighbour (one ends exactly
+    where the other starts) is merged with it, so back‑to‑back blocks are
+    stored as one period.
+    """
+    blocks = blocked_times.setdefault(property_id, [])
+    i = bisect.bisect_left(blocks, (start, end))
+    if i > 0 and blocks[i - 1][1] >= start:
+        i -= 1
+        start = blocks[i][0]
+        end = max(end, blocks.pop(i)[1])
+    while i < len(blocks) and blocks[i][0] <= end:
+        end = max(end, blocks.pop(i)[1])
+    blocks.insert(i, (start, end))
+    _schedule_rev[property_id] += 1
+
+
+def _interval_union(
+    intervals: List[Tuple[datetime, datetime]]
+) -> Tuple[List[datetime], List[datetime]]:
+    """
+    Merge possibly overlapping intervals into sorted, disjoint ``starts`` and
+    ``ends`` lists.  A time ``t`` is covered when ``i = bisect_right(starts, t) - 1``
+    is non‑negative and ``t < ends[i]`` (see ``_interval_covers``).
+    """
+    starts: List[datetime] = []
+    ends: List[datetime] = []
+    for b_start, b_end in sorted(intervals):
+        if ends and b_start <= ends[-1]:
+            if b_end > ends[-1]:
+                ends[-1] = b_end
+        else:
+            starts.append(b_start)
+            ends.append(b_end)
+    return starts, ends
+
+
+def _interval_covers(starts: List[datetime], ends: List[datetime], t: datetime) -> bool:
+    """Return whether ``t`` falls inside an interval from ``_interval_union``."""
+    i = bisect.bisect_right(starts, t) - 1
+    return i >= 0 and t < ends[i]
 
 
 def has_conflict(property_id: str, start: datetime, end: datetime) -> bool:
@@ -437,13 +1298,15 @@ def has_conflict(property_id: str, start: datetime, end: datetime) -> bool:
     Determine if the proposed showing conflicts with an existing showing for
     the same property.
     """
-    for s in showings.values():
-        if s["property_id"] != property_id or s["status"] == "declined":
-            continue
-        s_start = s["scheduled_at"]
-        s_end = s_start + timedelta(hours=1)  # assume 1‑hour showings
-        if start < s_end and end > s_start:
+    starts = _showing_starts.get(property_id, [])
+    prop_showings = showings_by_property.get(property_id, {})
+    # Showings last one hour, so only those starting after ``start - 1h``
+    # and before ``end`` can overlap; declined ones are skipped.
+    i = bisect.bisect_right(starts, (start - timedelta(hours=1), "\uffff"))
+    while i < len(starts) and starts[i][0] < end:
+        if prop_showings[starts[i][1]]["status"] != "declined":
             return True
+        i += 1
     return False
 
 
@@ -482,7 +1345,7 @@ def property_list() -> Any:
         address = data.get("address")
         if not name or not address:
             return jsonify({"error": "name and address are required"}), 400
-        prop_id = str(uuid.uuid4())
+        prop_id = uuid.uuid4().hex
         # capture optional contact details for seller and agent
         # Parse boolean flags for auto approval settings
         def parse_bool(val: Any) -> bool:
@@ -491,7 +1354,7 @@ def property_list() -> Any:
             if isinstance(val, str):
                 return val.lower() in {"true", "1", "yes", "on"}
             return False
-        properties[prop_id] = {
+        _add_property({
             "id": prop_id,
             "name": name,
             "address": address,
@@ -506,7 +1369,7 @@ def property_list() -> Any:
             "auto_approve_showings": parse_bool(data.get("auto_approve_showings")),
             # If true, disclosure packages require explicit approval before download
             "requires_disclosure_approval": parse_bool(data.get("requires_disclosure_approval")),
-        }
+        })
         return jsonify(properties[prop_id]), 201
     # GET
     return jsonify(list(properties.values()))
@@ -532,7 +1395,7 @@ def manage_blocks(property_id: str) -> Any:
         # Check overlap
         if is_time_blocked(property_id, start, end):
             return jsonify({"error": "time range overlaps existing block"}), 409
-        blocked_times.setdefault(property_id, []).append((start, end))
+        _add_block(property_id, start, end)
         return jsonify({"start": start.isoformat(), "end": end.isoformat()}), 201
     # GET
     return jsonify([
@@ -566,71 +1429,45 @@ def showing_list() -> Any:
         except Exception:
             return jsonify({"error": "invalid date format"}), 400
         end = start + timedelta(hours=1)
-        # Check blocks and conflicts
-        if is_time_blocked(prop_id, start, end):
-            return jsonify({"error": "requested time is blocked"}), 409
-        if has_conflict(prop_id, start, end):
-            return jsonify({"error": "requested time conflicts with another showing"}), 409
-        showing_id = str(uuid.uuid4())
-        showings[showing_id] = {
-            "id": showing_id,
-            "property_id": prop_id,
-            "client_name": client_name,
-            "client_phone": client_phone,
-            "client_email": client_email,
-            "scheduled_at": start,
-            "status": "pending",
-            "lockbox_code": None,
-            "code_expires_at": None,
-            "created_at": datetime.utcnow(),
-        }
+        # Check blocks and conflicts and claim the slot atomically
+        with _prop_locks[prop_id]:
+            if is_time_blocked(prop_id, start, end):
+                return jsonify({"error": "requested time is blocked"}), 409
+            if has_conflict(prop_id, start, end):
+                return jsonify({"error": "requested time conflicts with another showing"}), 409
+            showing_id = uuid.uuid4().hex
+            _add_showing({
+                "id": showing_id,
+                "property_id": prop_id,
+                "client_name": client_name,
+                "client_phone": client_phone,
+                "client_email": client_email,
+                "scheduled_at": start,
+                "status": "pending",
+                "lockbox_code": None,
+                "code_expires_at": None,
+                "created_at": g.now,
+            })
+        prop = properties.get(prop_id, {})
+        prop_name = prop.get("name", prop_id)
+        when = start.strftime(_WHEN_FORMAT)
         # Notify the buyer that their request was received
-        if client_phone:
-            try:
-                prop = properties.get(prop_id)
-                prop_name = prop.get("name") if prop else prop_id
-                when = start.strftime("%Y-%m-%d %H:%M")
-                send_sms(client_phone, f"Your showing request for {prop_name} on {when} has been received and is pending approval.")
-            except Exception:
-                pass
-        if client_email:
-            try:
-                prop = properties.get(prop_id)
-                prop_name = prop.get("name") if prop else prop_id
-                when = start.strftime("%Y-%m-%d %H:%M")
-                send_email(
-                    client_email,
-                    "Showing request received",
-                    f"Hello {client_name},\n\nYour showing request for {prop_name} on {when} has been received and is pending approval.\n\nThank you."
-                )
-            except Exception:
-                pass
+        try:
+            _notify_buyer(
+                client_phone,
+                client_email,
+                "Showing request received",
+                _SMS_REQUEST_RECEIVED(prop=prop_name, when=when),
+                _EMAIL_REQUEST_RECEIVED(name=client_name, prop=prop_name, when=when),
+            )
+        except Exception:
+            pass
         # Notify the seller and/or agent about the pending showing
         try:
-            prop = properties.get(prop_id, {})
-            prop_name = prop.get("name", prop_id)
-            when = start.strftime("%Y-%m-%d %H:%M")
-            seller_phone = prop.get("seller_phone")
-            seller_email = prop.get("seller_email")
-            agent_phone = prop.get("agent_phone")
-            agent_email = prop.get("agent_email")
             # Prepare the message with instructions
-            msg = (
-                f"New showing request for {prop_name}: {client_name} has requested to view the property on {when}.\n"
-                f"Use your dashboard or the API to approve, decline or reschedule this showing.\n"
-                f"Showing ID: {showing_id}"
-            )
-            subj = f"New showing request for {prop_name}"
-            # Send to seller
-            if seller_phone:
-                send_sms(seller_phone, msg)
-            if seller_email:
-                send_email(seller_email, subj, msg)
-            # Also send to agent if provided
-            if agent_phone:
-                send_sms(agent_phone, msg)
-            if agent_email:
-                send_email(agent_email, subj, msg)
+            msg = _NOTIFY_REQUESTED(prop=prop_name, name=client_name, when=when, showing_id=showing_id)
+            subj = _prop_subject(prop_id, _SUBJ_REQUESTED)
+            _notify_stakeholders(prop, subj, msg)
         except Exception:
             pass
         # Log the showing request as an activity event
@@ -645,7 +1482,6 @@ def showing_list() -> Any:
 
         # Auto‑approve the showing if the property is configured to do so
         try:
-            prop = properties.get(prop_id, {})
             if prop.get("auto_approve_showings"):
                 # mimic the approve_showing logic
                 s = showings.get(showing_id)
@@ -654,39 +1490,22 @@ def showing_list() -> Any:
                     s["lockbox_code"] = code
                     s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
                     s["status"] = "approved"
+                    _showings_changed()
                     # notify buyer about approval
-                    client_phone = s.get("client_phone")
-                    client_email2 = s.get("client_email")
-                    prop_name2 = prop.get("name", prop_id)
-                    when2 = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-                    code_str = s["lockbox_code"]
-                    expires_str = s["code_expires_at"].strftime("%Y-%m-%d %H:%M") if s.get("code_expires_at") else ""
-                    sms_msg2 = f"Your showing for {prop_name2} at {when2} has been approved. Lockbox code: {code_str} (expires {expires_str})."
-                    email_subj2 = "Showing approved"
-                    email_body2 = f"Hello {s['client_name']},\n\nYour showing for {prop_name2} at {when2} has been approved.\nYour lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you."
-                    if client_phone:
-                        send_sms(client_phone, sms_msg2)
-                    if client_email2:
-                        send_email(client_email2, email_subj2, email_body2)
+                    expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
+                    _notify_buyer(
+                        client_phone,
+                        client_email,
+                        "Showing approved",
+                        _SMS_APPROVED(prop=prop_name, when=when, code=code, exp=expires),
+                        _EMAIL_APPROVED(name=client_name, prop=prop_name, when=when, code=code, exp=expires),
+                    )
                     # notify seller/agent about auto approval
-                    seller_phone2 = prop.get("seller_phone")
-                    seller_email2 = prop.get("seller_email")
-                    agent_phone2 = prop.get("agent_phone")
-                    agent_email2 = prop.get("agent_email")
-                    notif_msg = (
-                        f"Showing for {prop_name2} on {when2} was automatically approved.\n"
-                        f"Buyer: {s['client_name']}. Lockbox code: {code_str} (expires {expires_str}).\n"
-                        f"Showing ID: {showing_id}"
+                    notif_msg = _NOTIFY_AUTO_APPROVED(
+                        prop=prop_name, when=when, name=client_name, code=code, exp=expires, showing_id=showing_id
                     )
-                    notif_subj = f"Showing auto‑approved for {prop_name2}"
-                    if seller_phone2:
-                        send_sms(seller_phone2, notif_msg)
-                    if seller_email2:
-                        send_email(seller_email2, notif_subj, notif_msg)
-                    if agent_phone2:
-                        send_sms(agent_phone2, notif_msg)
-                    if agent_email2:
-                        send_email(agent_email2, notif_subj, notif_msg)
+                    notif_subj = _prop_subject(prop_id, _SUBJ_AUTO_APPROVED)
+                    _notify_stakeholders(prop, notif_subj, notif_msg)
                     # log approval event
                     log_event(prop_id, "showing_approved", {
                         "showing_id": showing_id,
@@ -711,55 +1530,38 @@ def approve_showing(showing_id: str) -> Any:
     s = showings.get(showing_id)
     if not s:
         return jsonify({"error": "showing not found"}), 404
-    if s["status"] != "pending":
-        return jsonify({"error": "only pending showings can be approved"}), 400
-    code = generate_lockbox_code()
-    s["lockbox_code"] = code
-    s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
-    s["status"] = "approved"
+    with _prop_locks[s["property_id"]]:
+        if s["status"] != "pending":
+            return jsonify({"error": "only pending showings can be approved"}), 400
+        code = generate_lockbox_code()
+        s["lockbox_code"] = code
+        s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
+        s["status"] = "approved"
+        _showings_changed()
+    prop = properties.get(s["property_id"], {})
+    prop_name = prop.get("name", s["property_id"])
+    when = s["scheduled_at"].strftime(_WHEN_FORMAT)
+    expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
     # Send approval notifications to the buyer
     client_phone = s.get("client_phone")
     client_email = s.get("client_email")
     try:
-        prop = properties.get(s["property_id"])
-        prop_name = prop.get("name") if prop else s["property_id"]
-        when = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-        code_str = s["lockbox_code"]
-        expires_str = s["code_expires_at"].strftime("%Y-%m-%d %H:%M") if s.get("code_expires_at") else ""
-        sms_msg = f"Your showing for {prop_name} at {when} has been approved. Lockbox code: {code_str} (expires {expires_str})."
-        email_subj = "Showing approved"
-        email_body = f"Hello {s['client_name']},\n\nYour showing for {prop_name} at {when} has been approved.\nYour lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you."
-        if client_phone:
-            send_sms(client_phone, sms_msg)
-        if client_email:
-            send_email(client_email, email_subj, email_body)
+        _notify_buyer(
+            client_phone,
+            client_email,
+            "Showing approved",
+            _SMS_APPROVED(prop=prop_name, when=when, code=code, exp=expires),
+            _EMAIL_APPROVED(name=s["client_name"], prop=prop_name, when=when, code=code, exp=expires),
+        )
     except Exception:
         pass
     # Notify seller/agent that the showing has been approved (manual)
     try:
-        prop = properties.get(s["property_id"], {})
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
-        prop_name = prop.get("name", s["property_id"])
-        when = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-        code_str = s.get("lockbox_code") or ""
-        expires_str = s.get("code_expires_at").strftime("%Y-%m-%d %H:%M") if s.get("code_expires_at") else ""
-        msg_notify = (
-            f"Showing for {prop_name} on {when} has been approved.\n"
-            f"Buyer: {s['client_name']}. Lockbox code: {code_str} (expires {expires_str}).\n"
-            f"Showing ID: {showing_id}"
+        msg_notify = _NOTIFY_APPROVED(
+            prop=prop_name, when=when, name=s["client_name"], code=code, exp=expires, showing_id=showing_id
         )
-        subj_notify = f"Showing approved for {prop_name}"
-        if seller_phone:
-            send_sms(seller_phone, msg_notify)
-        if seller_email:
-            send_email(seller_email, subj_notify, msg_notify)
-        if agent_phone:
-            send_sms(agent_phone, msg_notify)
-        if agent_email:
-            send_email(agent_email, subj_notify, msg_notify)
+        subj_notify = _prop_subject(s["property_id"], _SUBJ_APPROVED)
+        _notify_stakeholders(prop, subj_notify, msg_notify)
     except Exception:
         pass
     # Log the approval event
@@ -783,23 +1585,25 @@ def decline_showing(showing_id: str) -> Any:
     s = showings.get(showing_id)
     if not s:
         return jsonify({"error": "showing not found"}), 404
-    if s["status"] != "pending":
-        return jsonify({"error": "only pending showings can be declined"}), 400
-    s["status"] = "declined"
+    with _prop_locks[s["property_id"]]:
+        if s["status"] != "pending":
+            return jsonify({"error": "only pending showings can be declined"}), 400
+        s["status"] = "declined"
+        _showings_changed()
+    prop = properties.get(s["property_id"], {})
+    prop_name = prop.get("name", s["property_id"])
+    when = s["scheduled_at"].strftime(_WHEN_FORMAT)
     # Notify the client of the decline via SMS/email if contact info is available
     client_phone = s.get("client_phone")
     client_email = s.get("client_email")
     try:
-        prop = properties.get(s["property_id"])
-        prop_name = prop.get("name") if prop else s["property_id"]
-        when = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-        sms_msg = f"Your showing request for {prop_name} on {when} has been declined."
-        email_subj = "Showing declined"
-        email_body = f"Hello {s['client_name']},\n\nYour showing request for {prop_name} on {when} has been declined.\n\nThank you."
-        if client_phone:
-            send_sms(client_phone, sms_msg)
-        if client_email:
-            send_email(client_email, email_subj, email_body)
+        _notify_buyer(
+            client_phone,
+            client_email,
+            "Showing declined",
+            _SMS_DECLINED(prop=prop_name, when=when),
+            _EMAIL_DECLINED(name=s["client_name"], prop=prop_name, when=when),
+        )
     except Exception:
         pass
     # Log the decline event
@@ -813,26 +1617,9 @@ def decline_showing(showing_id: str) -> Any:
         pass
     # Notify seller/agent of the declined showing
     try:
-        prop = properties.get(s["property_id"], {})
-        prop_name = prop.get("name", s["property_id"])
-        when = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-        msg_notify = (
-            f"Showing for {prop_name} on {when} has been declined.\n"
-            f"Buyer: {s['client_name']}. Showing ID: {showing_id}"
-        )
-        subj_notify = f"Showing declined for {prop_name}"
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
-        if seller_phone:
-            send_sms(seller_phone, msg_notify)
-        if seller_email:
-            send_email(seller_email, subj_notify, msg_notify)
-        if agent_phone:
-            send_sms(agent_phone, msg_notify)
-        if agent_email:
-            send_email(agent_email, subj_notify, msg_notify)
+        msg_notify = _NOTIFY_DECLINED(prop=prop_name, when=when, name=s["client_name"], showing_id=showing_id)
+        subj_notify = _prop_subject(s["property_id"], _SUBJ_DECLINED)
+        _notify_stakeholders(prop, subj_notify, msg_notify)
     except Exception:
         pass
     return jsonify(s)
@@ -858,38 +1645,34 @@ def reschedule_showing(showing_id: str) -> Any:
         return jsonify({"error": "invalid date format"}), 400
     end = start + timedelta(hours=1)
     prop_id = s["property_id"]
-    if is_time_blocked(prop_id, start, end):
-        return jsonify({"error": "requested time is blocked"}), 409
-    if has_conflict(prop_id, start, end):
-        return jsonify({"error": "requested time conflicts with another showing"}), 409
-    s["scheduled_at"] = start
-    # Re‑generate lockbox code if already approved
-    regenerated = False
-    if s["status"] == "approved":
-        s["lockbox_code"] = generate_lockbox_code()
-        s["code_expires_at"] = start + timedelta(hours=1, minutes=15)
-        regenerated = True
+    with _prop_locks[prop_id]:
+        if is_time_blocked(prop_id, start, end):
+            return jsonify({"error": "requested time is blocked"}), 409
+        if has_conflict(prop_id, start, end):
+            return jsonify({"error": "requested time conflicts with another showing"}), 409
+        _move_showing(s, start)
+        # Re‑generate lockbox code if already approved
+        regenerated = False
+        if s["status"] == "approved":
+            s["lockbox_code"] = generate_lockbox_code()
+            s["code_expires_at"] = start + timedelta(hours=1, minutes=15)
+            regenerated = True
+    prop = properties.get(prop_id, {})
+    prop_name = prop.get("name", prop_id)
+    when = start.strftime(_WHEN_FORMAT)
     # Notify the client about the new schedule via SMS/email
     client_phone = s.get("client_phone")
     client_email = s.get("client_email")
     try:
-        prop = properties.get(prop_id)
-        prop_name = prop.get("name") if prop else prop_id
-        when_str = start.strftime("%Y-%m-%d %H:%M")
         if regenerated:
-            code_str = s.get("lockbox_code")
-            expires_str = s.get("code_expires_at").strftime("%Y-%m-%d %H:%M") if s.get("code_expires_at") else ""
-            sms_msg = f"Your showing for {prop_name} has been rescheduled to {when_str}. New lockbox code: {code_str} (expires {expires_str})."
-            email_subj = "Showing rescheduled"
-            email_body = f"Hello {s['client_name']},\n\nYour showing for {prop_name} has been rescheduled to {when_str}.\nYour new lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you."
+            code = s["lockbox_code"]
+            expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
+            sms_msg = _SMS_RESCHEDULED_CODE(prop=prop_name, when=when, code=code, exp=expires)
+            email_body = _EMAIL_RESCHEDULED_CODE(name=s["client_name"], prop=prop_name, when=when, code=code, exp=expires)
         else:
-            sms_msg = f"Your showing request for {prop_name} has been rescheduled to {when_str} and is pending approval."
-            email_subj = "Showing rescheduled"
-            email_body = f"Hello {s['client_name']},\n\nYour showing request for {prop_name} has been rescheduled to {when_str} and is pending approval.\n\nThank you."
-        if client_phone:
-            send_sms(client_phone, sms_msg)
-        if client_email:
-            send_email(client_email, email_subj, email_body)
+            sms_msg = _SMS_RESCHEDULED_PENDING(prop=prop_name, when=when)
+            email_body = _EMAIL_RESCHEDULED_PENDING(name=s["client_name"], prop=prop_name, when=when)
+        _notify_buyer(client_phone, client_email, "Showing rescheduled", sms_msg, email_body)
     except Exception:
         pass
     # Log the reschedule event
@@ -903,26 +1686,9 @@ def reschedule_showing(showing_id: str) -> Any:
         pass
     # Notify seller/agent about the reschedule
     try:
-        prop = properties.get(prop_id, {})
-        prop_name = prop.get("name", prop_id)
-        # Determine message based on whether new code was generated
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
-        msg_notify = (
-            f"Showing for {prop_name} has been rescheduled to {when_str}.\n"
-            f"Buyer: {s['client_name']}. Showing ID: {showing_id}"
-        )
-        subj_notify = f"Showing rescheduled for {prop_name}"
-        if seller_phone:
-            send_sms(seller_phone, msg_notify)
-        if seller_email:
-            send_email(seller_email, subj_notify, msg_notify)
-        if agent_phone:
-            send_sms(agent_phone, msg_notify)
-        if agent_email:
-            send_email(agent_email, subj_notify, msg_notify)
+        msg_notify = _NOTIFY_RESCHEDULED(prop=prop_name, when=when, name=s["client_name"], showing_id=showing_id)
+        subj_notify = _prop_subject(prop_id, _SUBJ_RESCHEDULED)
+        _notify_stakeholders(prop, subj_notify, msg_notify)
     except Exception:
         pass
     return jsonify(s)
@@ -938,20 +1704,22 @@ def submit_feedback(showing_id: str) -> Any:
     if not s:
         return jsonify({"error": "showing not found"}), 404
     data = request.json or {}
-    try:
-        rating = int(data.get("rating"))
-    except Exception:
+    rating = data.get("rating")
+    # Type checks instead of int() coercion keep bad payloads off the
+    # exception path; bool is excluded because it subclasses int.
+    if not isinstance(rating, int) or isinstance(rating, bool):
         return jsonify({"error": "rating must be an integer"}), 400
     comment = data.get("comment")
-    if rating < 1 or rating > 5 or not comment:
+    if not 1 <= rating <= 5 or not isinstance(comment, str) or not comment:
         return jsonify({"error": "rating must be 1–5 and comment required"}), 400
     entry = {
-        "id": str(uuid.uuid4()),
+        "id": uuid.uuid4().hex,
         "rating": rating,
         "comment": comment,
-        "created_at": datetime.utcnow(),
+        "created_at": g.now,
     }
     feedback_store.setdefault(showing_id, []).append(entry)
+    feedback_count_by_property[s["property_id"]] += 1
     # Log feedback submission
     try:
         property_id = s["property_id"]  # type: ignore[name-defined]
@@ -966,23 +1734,9 @@ def submit_feedback(showing_id: str) -> Any:
     try:
         prop = properties.get(s["property_id"], {})  # type: ignore[name-defined]
         prop_name = prop.get("name", s["property_id"])  # type: ignore[name-defined]
-        msg_notify = (
-            f"New feedback received for showing ID {showing_id} on {prop_name}.\n"
-            f"Rating: {rating}, Comment: {comment}"
-        )
-        subj_notify = f"Showing feedback for {prop_name}"
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
-        if seller_phone:
-            send_sms(seller_phone, msg_notify)
-        if seller_email:
-            send_email(seller_email, subj_notify, msg_notify)
-        if agent_phone:
-            send_sms(agent_phone, msg_notify)
-        if agent_email:
-            send_email(agent_email, subj_notify, msg_notify)
+        msg_notify = _NOTIFY_FEEDBACK(showing_id=showing_id, prop=prop_name, rating=rating, comment=comment)
+        subj_notify = _prop_subject(s["property_id"], _SUBJ_FEEDBACK)
+        _notify_stakeholders(prop, subj_notify, msg_notify)
     except Exception:
         pass
     return jsonify(entry), 201
@@ -999,7 +1753,7 @@ def get_lockbox_code(showing_id: str) -> Any:
         return jsonify({"error": "showing not found"}), 404
     if s["status"] != "approved" or not s["lockbox_code"]:
         return jsonify({"error": "showing is not approved"}), 400
-    if s["code_expires_at"] and datetime.utcnow() > s["code_expires_at"]:
+    if s["code_expires_at"] and g.now > s["code_expires_at"]:
         return jsonify({"error": "code expired"}), 410
     return jsonify({
         "lockbox_code": s["lockbox_code"],
@@ -1029,7 +1783,10 @@ def tour_list() -> Any:
                 return jsonify({"error": f"showing {sid} is not approved"}), 400
             selected.append(s)
         selected.sort(key=lambda x: x["scheduled_at"])
-        tour_id = str(uuid.uuid4())
+        # Resolve each stop's address before building anything so a missing
+        # property fails here rather than half way through the itinerary.
+        stops = [(s, properties[s["property_id"]]["address"]) for s in selected]
+        tour_id = uuid.uuid4().hex
         tours[tour_id] = {
             "id": tour_id,
             "showings": [s["id"] for s in selected],
@@ -1038,17 +1795,26 @@ def tour_list() -> Any:
                     "showing_id": s["id"],
                     "property_id": s["property_id"],
                     "scheduled_at": s["scheduled_at"].isoformat(),
-                    "address": properties[s["property_id"]]["address"],
+                    "address": address,
                 }
-                for s in selected
+                for s, address in stops
             ],
-            "created_at": datetime.utcnow(),
+            "created_at": g.now,
         }
         return jsonify(tours[tour_id]), 201
     # GET
     return jsonify(list(tours.values()))
 
 
+def _serialize_showing(s: Dict[str, Any]) -> Dict[str, Any]:
+    """Return a JSON‑ready copy of a showing with ISO dates and its feedback."""
+    out: Dict[str, Any] = {}
+    for k, v in s.items():
+        out[k] = v.isoformat() if isinstance(v, datetime) else v
+    out["feedback"] = feedback_store.get(s["id"], [])
+    return out
+
+
 @app.route("/properties/<property_id>/dashboard", methods=["GET"])
 def property_dashboard(property_id: str) -> Any:
     """
@@ -1059,26 +1825,15 @@ def property_dashboard(property_id: str) -> Any:
     prop = properties.get(property_id)
     if not prop:
         return jsonify({"error": "property not found"}), 404
-    upcoming = [
-        s for s in showings.values() if s["property_id"] == property_id
-    ]
+    with _prop_locks[property_id]:
+        upcoming = list(showings_by_property.get(property_id, {}).values())
+        blocks = list(blocked_times.get(property_id, []))
     dashboard = {
         "property": prop,
-        "showings": [
-            {
-                **{
-                    k: (v.isoformat() if isinstance(v, datetime) else v)
-                    for k, v in s.items()
-                    if k != "property_id"
-                },
-                "property_id": s["property_id"],
-                "feedback": feedback_store.get(s["id"], []),
-            }
-            for s in upcoming
-        ],
+        "showings": [_serialize_showing(s) for s in upcoming],
         "blocked_times": [
             {"start": s.isoformat(), "end": e.isoformat()}
-            for s, e in blocked_times.get(property_id, [])
+            for s, e in blocks
         ],
     }
     return jsonify(dashboard)
@@ -1090,8 +1845,9 @@ def property_dashboard(property_id: str) -> Any:
 # These routes allow sellers or agents to upload disclosure packages for a
 # property, retrieve a list of uploaded files, download individual
 # disclosures, view an activity log and generate summary reports.  Files
-# are stored in memory for demonstration purposes and will be lost when
-# the application restarts.
+# are written to ``DISCLOSURE_FOLDER`` and streamed from disk on download;
+# the index of uploaded files is kept in memory and will be lost when the
+# application restarts.
 
 @app.route("/properties/<property_id>/disclosures", methods=["GET", "POST"])
 def property_disclosures(property_id: str) -> Any:
@@ -1099,7 +1855,7 @@ def property_disclosures(property_id: str) -> Any:
     Upload a disclosure file for a property or list existing disclosures.
 
     * POST: Accepts a multipart/form upload with a single ``file`` field.  The
-      file is stored in memory and associated with the property.  Returns
+      file is saved to disk and associated with the property.  Returns
       JSON containing the filename.  Logs an ``upload_disclosure`` event.
 
     * GET: Returns a JSON list of filenames representing disclosures
@@ -1111,11 +1867,10 @@ def property_disclosures(property_id: str) -> Any:
         if "file" not in request.files:
             return jsonify({"error": "file is required"}), 400
         file = request.files["file"]
-        filename = secure_filename(file.filename or "")
+        filename = _secure(file.filename or "")
         if not filename:
             return jsonify({"error": "invalid filename"}), 400
-        data = file.read()
-        disclosures.setdefault(property_id, {})[filename] = data
+        save_disclosure(property_id, filename, file)
         # Log the upload event
         try:
             log_event(property_id, "upload_disclosure", {"filename": filename})
@@ -1136,9 +1891,9 @@ def download_disclosure(property_id: str, filename: str) -> Any:
     if property_id not in properties:
         return jsonify({"error": "property not found"}), 404
     # Ensure the filename is safe
-    safe_name = secure_filename(filename)
-    data = disclosures.get(property_id, {}).get(safe_name)
-    if data is None:
+    safe_name = _secure(filename)
+    meta = disclosures.get(property_id, {}).get(safe_name)
+    if meta is None:
         return jsonify({"error": "file not found"}), 404
     # Log download event
     try:
@@ -1146,9 +1901,10 @@ def download_disclosure(property_id: str, filename: str) -> Any:
     except Exception:
         pass
     return send_file(
-        io.BytesIO(data),
+        meta["path"],
         download_name=safe_name,
         as_attachment=True,
+        etag=meta["sha256"],
     )
 
 
@@ -1161,7 +1917,9 @@ def get_activity_log(property_id: str) -> Any:
     """
     if property_id not in properties:
         return jsonify({"error": "property not found"}), 404
-    return jsonify(activity_logs.get(property_id, []))
+    with _prop_locks[property_id]:
+        events = activity_logs.get(property_id, [])[:]
+    return jsonify(events)
 
 
 @app.route("/properties/<property_id>/report", methods=["GET"])
@@ -1174,28 +1932,24 @@ def property_report(property_id: str) -> Any:
     """
     if property_id not in properties:
         return jsonify({"error": "property not found"}), 404
-    events = activity_logs.get(property_id, [])
-    counts: Dict[str, int] = {}
-    for ev in events:
-        counts[ev["type"]] = counts.get(ev["type"], 0) + 1
+    with _prop_locks[property_id]:
+        counts = dict(event_counts_by_property.get(property_id, {}))
+        prop_showings = list(showings_by_property.get(property_id, {}).values())
+    by_status = dict.fromkeys(_STATUSES, 0)
+    for s in prop_showings:
+        if s["status"] in by_status:
+            by_status[s["status"]] += 1
     report = {
         "property": properties[property_id],
         "event_counts": counts,
         "disclosure_count": len(disclosures.get(property_id, {})),
-        "package_count": sum(1 for pkg in packages.values() if pkg["property_id"] == property_id),
-        "share_count": sum(1 for sh in package_shares.values() if sh["property_id"] == property_id),
+        "package_count": len(packages_by_property.get(property_id, {})),
+        "share_count": len(shares_by_property.get(property_id, {})),
         "offers_count": len(offers.get(property_id, [])),
-        "total_showings": sum(1 for s in showings.values() if s["property_id"] == property_id),
-        "showings_by_status": {
-            status: sum(1 for s in showings.values() if s["property_id"] == property_id and s["status"] == status)
-            for status in {"pending", "approved", "declined"}
-        },
-        "feedback_count": sum(len(feedback_store.get(sid, [])) for sid, s in showings.items() if s["property_id"] == property_id),
-        "disclosure_feedback_count": sum(
-            len(disclosure_feedback_store.get(share_id, []))
-            for share_id, share in package_shares.items()
-            if share.get("property_id") == property_id
-        ),
+        "total_showings": len(prop_showings),
+        "showings_by_status": by_status,
+        "feedback_count": feedback_count_by_property[property_id],
+        "disclosure_feedback_count": disclosure_feedback_count_by_property[property_id],
     }
     return jsonify(report)
 
@@ -1233,29 +1987,29 @@ def manage_packages(property_id: str) -> Any:
             return jsonify({"error": "name and non‑empty files list required"}), 400
         # Validate file names exist for the property
         prop_files = disclosures.get(property_id, {})
-        for fn in files:
-            safe_fn = secure_filename(fn)
+        safe_files = [_secure(fn) for fn in files]
+        for fn, safe_fn in zip(files, safe_files):
             if safe_fn not in prop_files:
                 return jsonify({"error": f"file {fn} not found for property"}), 400
-        pkg_id = str(uuid.uuid4())
-        packages[pkg_id] = {
+        pkg_id = uuid.uuid4().hex
+        pkg = _add_package({
             "id": pkg_id,
             "property_id": property_id,
             "name": name,
-            "files": [secure_filename(fn) for fn in files],
+            "files": safe_files,
             "is_public": is_public,
-            "created_at": datetime.utcnow().isoformat(),
-        }
+            "created_at": g.now.isoformat(),
+        })
         # Log package creation
         try:
             log_event(property_id, "package_created", {"package_id": pkg_id, "name": name, "files": files, "is_public": is_public})
         except Exception:
             pass
-        return jsonify(packages[pkg_id]), 201
+        return jsonify(pkg), 201
     # GET: list packages
     return jsonify([
         {k: v for k, v in pkg.items() if k != "property_id"}
-        for pkg in packages.values() if pkg["property_id"] == property_id
+        for pkg in packages_by_property.get(property_id, {}).values()
     ])
 
 
@@ -1288,12 +2042,12 @@ def create_share(package_id: str) -> Any:
     # Capture optional buyer contact information for notifications
     buyer_phone = data.get("buyer_phone")
     buyer_email = data.get("buyer_email")
-    share_id = str(uuid.uuid4())
+    share_id = uuid.uuid4().hex
     prop_id = pkg["property_id"]
     prop = properties.get(prop_id, {})
     # Determine whether this share is automatically approved based on property setting
     auto = not prop.get("requires_disclosure_approval")
-    package_shares[share_id] = {
+    _add_share({
         "id": share_id,
         "package_id": package_id,
         "property_id": prop_id,
@@ -1302,63 +2056,37 @@ def create_share(package_id: str) -> Any:
         "buyer_email": buyer_email,
         "downloads": [],  # list of dicts {filename, timestamp}
         "approved": auto,
-    }
+    })
     # Log share creation
     try:
         log_event(prop_id, "share_created", {"share_id": share_id, "package_id": package_id, "buyer_name": buyer_name, "auto": auto})
     except Exception:
         pass
     # Notify seller/agent of the share request.
+    prop_name = prop.get("name", prop_id)
     try:
-        prop_name = prop.get("name", prop_id)
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
         if auto:
             # Auto‑approved share
-            msg = (
-                f"Disclosure package '{pkg['name']}' for {prop_name} was automatically shared with buyer {buyer_name}."
-                f" (Share ID: {share_id})"
-            )
-            subj = f"Disclosure package shared for {prop_name}"
+            msg = _NOTIFY_SHARE_AUTO(pkg=pkg["name"], prop=prop_name, buyer=buyer_name, share_id=share_id)
+            subj = _SUBJ_SHARE_AUTO(prop=prop_name)
         else:
             # Approval required
-            msg = (
-                f"Buyer {buyer_name} has requested access to disclosure package '{pkg['name']}' for {prop_name}.\n"
-                f"Approve the share via POST /share/{share_id}/approve."
-            )
-            subj = f"Disclosure access request for {prop_name}"
-        if seller_phone:
-            send_sms(seller_phone, msg)
-        if seller_email:
-            send_email(seller_email, subj, msg)
-        if agent_phone:
-            send_sms(agent_phone, msg)
-        if agent_email:
-            send_email(agent_email, subj, msg)
+            msg = _NOTIFY_SHARE_REQUESTED(buyer=buyer_name, pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            subj = _SUBJ_SHARE_REQUESTED(prop=prop_name)
+        _notify_stakeholders(prop, subj, msg)
     except Exception:
         pass
     # Notify the buyer about the share status
     try:
         if auto:
             # If the share is auto approved, tell the buyer they can download the package
-            buyer_msg = (
-                f"You have been granted access to disclosure package '{pkg['name']}' for {prop_name}.\n"
-                f"Use your share ID {share_id} to download the files."
-            )
-            buyer_subj = f"Disclosure package available for {prop_name}"
+            buyer_msg = _BUYER_SHARE_GRANTED(pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            buyer_subj = _BUYER_SUBJ_SHARE_GRANTED(prop=prop_name)
         else:
             # Otherwise inform them that approval is pending
-            buyer_msg = (
-                f"Your request to access disclosure package '{pkg['name']}' for {prop_name} has been received and is pending approval.\n"
-                f"You will be notified when access is granted."
-            )
-            buyer_subj = f"Disclosure access request received for {prop_name}"
-        if buyer_phone:
-            send_sms(buyer_phone, buyer_msg)
-        if buyer_email:
-            send_email(buyer_email, buyer_subj, buyer_msg)
+            buyer_msg = _BUYER_SHARE_PENDING(pkg=pkg["name"], prop=prop_name)
+            buyer_subj = _BUYER_SUBJ_SHARE_PENDING(prop=prop_name)
+        _notify_buyer(buyer_phone, buyer_email, buyer_subj, buyer_msg)
     except Exception:
         pass
     return jsonify({"share_id": share_id, "approved": auto}), 201
@@ -1394,18 +2122,18 @@ def share_download(share_id: str, filename: str) -> Any:
     pkg = packages.get(share["package_id"])
     if not pkg:
         return jsonify({"error": "package not found"}), 404
-    safe_fn = secure_filename(filename)
+    safe_fn = _secure(filename)
     if safe_fn not in pkg["files"]:
         return jsonify({"error": "file not found in package"}), 404
     # Check approval status; if not approved, return 403
     if not share.get("approved", False):
         return jsonify({"error": "download not approved"}), 403
     prop_id = pkg["property_id"]
-    data = disclosures.get(prop_id, {}).get(safe_fn)
-    if data is None:
+    meta = disclosures.get(prop_id, {}).get(safe_fn)
+    if meta is None:
         return jsonify({"error": "file not found"}), 404
     # Record download in share
-    timestamp = datetime.utcnow().isoformat()
+    timestamp = g.now.isoformat()
     share["downloads"].append({"filename": safe_fn, "timestamp": timestamp})
     # Log activity event
     try:
@@ -1413,9 +2141,10 @@ def share_download(share_id: str, filename: str) -> Any:
     except Exception:
         pass
     return send_file(
-        io.BytesIO(data),
+        meta["path"],
         download_name=safe_fn,
         as_attachment=True,
+        etag=meta["sha256"],
     )
 
 # -----------------------------------------------------------------------------
@@ -1454,8 +2183,8 @@ def request_disclosure(property_id: str) -> Any:
     # Determine auto approval based on property settings
     prop = properties.get(property_id, {})
     auto = not prop.get("requires_disclosure_approval")
-    share_id = str(uuid.uuid4())
-    package_shares[share_id] = {
+    share_id = secrets.token_hex(16)
+    _add_share({
         "id": share_id,
         "package_id": pkg_id,
         "property_id": property_id,
@@ -1464,7 +2193,7 @@ def request_disclosure(property_id: str) -> Any:
         "buyer_email": buyer_email,
         "downloads": [],
         "approved": auto,
-    }
+    })
     # Log disclosure request
     try:
         log_event(property_id, "disclosure_requested", {
@@ -1475,54 +2204,25 @@ def request_disclosure(property_id: str) -> Any:
         })
     except Exception:
         pass
-    # Notify seller/agent
+    # Notify seller/agent and the buyer, batched per channel
     try:
         prop_name = prop.get("name", property_id)
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
         if auto:
-            msg = (
-                f"Disclosure package '{pkg['name']}' for {prop_name} was automatically shared with buyer {buyer_name}."
-                f" (Share ID: {share_id})"
-            )
-            subj = f"Disclosure package shared for {prop_name}"
+            msg = _NOTIFY_SHARE_AUTO(pkg=pkg["name"], prop=prop_name, buyer=buyer_name, share_id=share_id)
+            subj = _SUBJ_SHARE_AUTO(prop=prop_name)
+            buyer_msg = _BUYER_SHARE_GRANTED(pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            buyer_subj = _BUYER_SUBJ_SHARE_GRANTED(prop=prop_name)
         else:
-            msg = (
-                f"Buyer {buyer_name} has requested access to disclosure package '{pkg['name']}' for {prop_name}.\n"
-                f"Approve the share via POST /share/{share_id}/approve."
-            )
-            subj = f"Disclosure access request for {prop_name}"
-        if seller_phone:
-            send_sms(seller_phone, msg)
-        if seller_email:
-            send_email(seller_email, subj, msg)
-        if agent_phone:
-            send_sms(agent_phone, msg)
-        if agent_email:
-            send_email(agent_email, subj, msg)
-    except Exception:
-        pass
-    # Notify buyer about the status
-    try:
-        prop_name = prop.get("name", property_id)
-        if auto:
-            buyer_msg = (
-                f"You have been granted access to disclosure package '{pkg['name']}' for {prop_name}.\n"
-                f"Use your share ID {share_id} to download the files."
-            )
-            buyer_subj = f"Disclosure package available for {prop_name}"
-        else:
-            buyer_msg = (
-                f"Your request to access disclosure package '{pkg['name']}' for {prop_name} has been received and is pending approval.\n"
-                f"You will be notified when access is granted."
-            )
-            buyer_subj = f"Disclosure access request received for {prop_name}"
+            msg = _NOTIFY_SHARE_REQUESTED(buyer=buyer_name, pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            subj = _SUBJ_SHARE_REQUESTED(prop=prop_name)
+            buyer_msg = _BUYER_SHARE_PENDING(pkg=pkg["name"], prop=prop_name)
+            buyer_subj = _BUYER_SUBJ_SHARE_PENDING(prop=prop_name)
+        sms, emails = _stakeholder_batch(prop, subj, msg)
         if buyer_phone:
-            send_sms(buyer_phone, buyer_msg)
+            sms.append((buyer_phone, buyer_msg))
         if buyer_email:
-            send_email(buyer_email, buyer_subj, buyer_msg)
+            emails.append((buyer_email, buyer_subj, buyer_msg))
+        notify_bulk(sms, emails)
     except Exception:
         pass
     return jsonify({"share_id": share_id, "approved": auto}), 201
@@ -1538,13 +2238,13 @@ def buyer_interest(property_id: str) -> Any:
     """
     if property_id not in properties:
         return jsonify({"error": "property not found"}), 404
-    report = []
-    for share in package_shares.values():
-        if share["property_id"] == property_id:
-            report.append({
-                "buyer_name": share["buyer_name"],
-                "downloads": len(share.get("downloads", [])),
-            })
+    report = [
+        {
+            "buyer_name": share["buyer_name"],
+            "downloads": len(share.get("downloads", [])),
+        }
+        for share in shares_by_property.get(property_id, {}).values()
+    ]
     return jsonify(report)
 
 # -----------------------------------------------------------------------------
@@ -1575,13 +2275,14 @@ def share_feedback(share_id: str) -> Any:
     if rating < 1 or rating > 5 or not comment:
         return jsonify({"error": "rating must be 1–5 and comment required"}), 400
     entry = {
-        "id": str(uuid.uuid4()),
+        "id": secrets.token_hex(16),
         "rating": rating,
         "comment": comment,
         "buyer_name": share.get("buyer_name"),
-        "created_at": datetime.utcnow().isoformat(),
+        "created_at": g.now.isoformat(),
     }
     disclosure_feedback_store.setdefault(share_id, []).append(entry)
+    disclosure_feedback_count_by_property[share.get("property_id")] += 1
     # Log feedback event
     try:
         prop_id = share.get("property_id")
@@ -1598,23 +2299,9 @@ def share_feedback(share_id: str) -> Any:
         prop_id = share.get("property_id")
         prop = properties.get(prop_id, {})
         prop_name = prop.get("name", prop_id)
-        msg_notify = (
-            f"New disclosure feedback received for {prop_name} (share ID {share_id}).\n"
-            f"Rating: {rating}, Comment: {comment}"
-        )
-        subj_notify = f"Disclosure feedback for {prop_name}"
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
-        if seller_phone:
-            send_sms(seller_phone, msg_notify)
-        if seller_email:
-            send_email(seller_email, subj_notify, msg_notify)
-        if agent_phone:
-            send_sms(agent_phone, msg_notify)
-        if agent_email:
-            send_email(agent_email, subj_notify, msg_notify)
+        msg_notify = _NOTIFY_SHARE_FEEDBACK(prop=prop_name, share_id=share_id, rating=rating, comment=comment)
+        subj_notify = _SUBJ_SHARE_FEEDBACK(prop=prop_name)
+        _notify_stakeholders(prop, subj_notify, msg_notify)
     except Exception:
         pass
     return jsonify(entry), 201
@@ -1635,9 +2322,8 @@ def approve_share(share_id: str) -> Any:
     share = package_shares.get(share_id)
     if not share:
         return jsonify({"error": "share not found"}), 404
-    if share.get("approved"):
+    if not _claim_share_approval(share):
         return jsonify(share), 200
-    share["approved"] = True
     # Log approval event
     prop_id = share.get("property_id")
     try:
@@ -1649,35 +2335,19 @@ def approve_share(share_id: str) -> Any:
         prop = properties.get(prop_id, {})
         prop_name = prop.get("name", prop_id)
         buyer_name = share.get("buyer_name")
-        msg_notify = (
-            f"Disclosure package share (ID: {share_id}) for {prop_name} has been approved.\n"
-            f"Buyer: {buyer_name}."
-        )
-        subj_notify = f"Disclosure share approved for {prop_name}"
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
-        if seller_phone:
-            send_sms(seller_phone, msg_notify)
-        if seller_email:
-            send_email(seller_email, subj_notify, msg_notify)
-        if agent_phone:
-            send_sms(agent_phone, msg_notify)
-        if agent_email:
-            send_email(agent_email, subj_notify, msg_notify)
+        msg_notify = _NOTIFY_SHARE_APPROVED(share_id=share_id, prop=prop_name, buyer=buyer_name)
+        subj_notify = _SUBJ_SHARE_APPROVED(prop=prop_name)
+        sms, emails = _stakeholder_batch(prop, subj_notify, msg_notify)
         # Notify the buyer that access has been granted
         buyer_phone = share.get("buyer_phone")
         buyer_email = share.get("buyer_email")
-        buyer_msg = (
-            f"Your request to access disclosure package for {prop_name} has been approved.\n"
-            f"Use your share ID {share_id} to download the files."
-        )
-        buyer_subj = f"Disclosure package approved for {prop_name}"
+        buyer_msg = _BUYER_SHARE_APPROVED(prop=prop_name, share_id=share_id)
+        buyer_subj = _BUYER_SUBJ_SHARE_APPROVED(prop=prop_name)
         if buyer_phone:
-            send_sms(buyer_phone, buyer_msg)
+            sms.append((buyer_phone, buyer_msg))
         if buyer_email:
-            send_email(buyer_email, buyer_subj, buyer_msg)
+            emails.append((buyer_email, buyer_subj, buyer_msg))
+        notify_bulk(sms, emails)
     except Exception:
         pass
     return jsonify(share)
@@ -1714,15 +2384,16 @@ def property_offers(property_id: str) -> Any:
             price_val = float(price)
         except Exception:
             return jsonify({"error": "price must be numeric"}), 400
-        offer_id = str(uuid.uuid4())
+        offer_id = secrets.token_hex(16)
         offer_entry = {
             "id": offer_id,
             "buyer_name": buyer_name,
             "price": price_val,
             "terms": terms,
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": g.now.isoformat(),
         }
         offers.setdefault(property_id, []).append(offer_entry)
+        _offers_report_cache.pop(property_id, None)
         # Log offer submission
         try:
             log_event(property_id, "offer_submitted", {"offer_id": offer_id, "buyer_name": buyer_name, "price": price_val})
@@ -1742,21 +2413,38 @@ def offers_report(property_id: str) -> Any:
     """
     if property_id not in properties:
         return jsonify({"error": "property not found"}), 404
+    cached = _offers_report_cache.get(property_id)
+    if cached is not None:
+        return jsonify(cached)
     prop_offers = offers.get(property_id)
     if not prop_offers:
         return jsonify({"error": "no offers for property"}), 404
-    sorted_offers = sorted(prop_offers, key=lambda x: x["price"], reverse=True)
-    total = sum(o["price"] for o in sorted_offers)
-    avg = total / len(sorted_offers)
+    # The full sorted list is part of the response, so the sort stays; the
+    # top offer falls out of it and the total is summed in C via map().
+    by_price = itemgetter("price")
+    sorted_offers = sorted(prop_offers, key=by_price, reverse=True)
+    avg = sum(map(by_price, sorted_offers)) / len(sorted_offers)
     report = {
         "offers": sorted_offers,
         "top_offer": sorted_offers[0],
         "average_price": avg,
         "count": len(sorted_offers),
     }
+    _offers_report_cache[property_id] = report
     return jsonify(report)
 
 
+def _prospect_counters() -> Dict[str, int]:
+    """Return a zeroed per‑buyer counter record for ``property_prospects``."""
+    return {
+        "showings_requested": 0,
+        "showings_approved": 0,
+        "showings_declined": 0,
+        "downloads": 0,
+        "offers": 0,
+    }
+
+
 @app.route("/properties/<property_id>/prospects", methods=["GET"])
 def property_prospects(property_id: str) -> Any:
     """
@@ -1770,19 +2458,10 @@ def property_prospects(property_id: str) -> Any:
     """
     if property_id not in properties:
         return jsonify({"error": "property not found"}), 404
-    stats: Dict[str, Dict[str, int]] = {}
+    stats: Dict[str, Dict[str, int]] = defaultdict(_prospect_counters)
     # Aggregate showings
-    for s in showings.values():
-        if s["property_id"] != property_id:
-            continue
-        buyer = s.get("client_name") or "Unknown"
-        rec = stats.setdefault(buyer, {
-            "showings_requested": 0,
-            "showings_approved": 0,
-            "showings_declined": 0,
-            "downloads": 0,
-            "offers": 0,
-        })
+    for s in showings_by_property.get(property_id, {}).values():
+        rec = stats[s.get("client_name") or "Unknown"]
         rec["showings_requested"] += 1
         status = s.get("status")
         if status == "approved":
@@ -1790,39 +2469,52 @@ def property_prospects(property_id: str) -> Any:
         elif status == "declined":
             rec["showings_declined"] += 1
     # Aggregate downloads from shares
-    for share in package_shares.values():
-        if share["property_id"] != property_id:
-            continue
-        buyer = share.get("buyer_name") or "Unknown"
-        rec = stats.setdefault(buyer, {
-            "showings_requested": 0,
-            "showings_approved": 0,
-            "showings_declined": 0,
-            "downloads": 0,
-            "offers": 0,
-        })
-        rec["downloads"] += len(share.get("downloads", []))
+    for share in shares_by_property.get(property_id, {}).values():
+        stats[share.get("buyer_name") or "Unknown"]["downloads"] += len(share.get("downloads", []))
     # Aggregate offers
     for offer in offers.get(property_id, []):
-        buyer = offer.get("buyer_name") or "Unknown"
-        rec = stats.setdefault(buyer, {
-            "showings_requested": 0,
-            "showings_approved": 0,
-            "showings_declined": 0,
-            "downloads": 0,
-            "offers": 0,
-        })
-        rec["offers"] += 1
-    return jsonify(stats)
+        stats[offer.get("buyer_name") or "Unknown"]["offers"] += 1
+    return jsonify(dict(stats))
 
 
 # -----------------------------------------------------------------------------
 # Administration UI
 #
 # A simple form for configuring Twilio credentials (account SID, auth token and
-# default sender number).  This endpoint renders a plain HTML page using
-# ``render_template_string`` and accepts POST submissions.  It does not
-# include authentication; in a real application you would restrict access.
+# default sender number).  This endpoint renders a plain HTML page from an
+# inline template and accepts POST submissions.  It does not include
+# authentication; in a real application you would restrict access.
+#
+# The admin page templates are compiled once at import time rather than being
+# re‑parsed by ``render_template_string`` on every request.
+_TWILIO_ADMIN_TMPL = app.jinja_env.from_string("""
+<h1>Twilio Configuration</h1>
+{% if message %}<p>{{ message }}</p>{% endif %}
+<form method="post">
+    <label>Account SID: <input type="text" name="account_sid" value="{{ config.account_sid or '' }}"></label><br>
+    <label>Auth Token: <input type="text" name="auth_token" value="{{ config.auth_token or '' }}"></label><br>
+    <label>From Number: <input type="text" name="from_number" value="{{ config.from_number or '' }}"></label><br>
+    <button type="submit">Save</button>
+</form>
+""")
+_EMAIL_ADMIN_TMPL = app.jinja_env.from_string("""
+<h1>Email Configuration</h1>
+{% if message %}<p>{{ message }}</p>{% endif %}
+<form method="post">
+    <label>SMTP Server: <input type="text" name="smtp_server" value="{{ cfg.smtp_server or '' }}"></label><br>
+    <label>SMTP Port: <input type="text" name="smtp_port" value="{{ cfg.smtp_port or '' }}"></label><br>
+    <label>SMTP Username: <input type="text" name="smtp_username" value="{{ cfg.smtp_username or '' }}"></label><br>
+    <label>SMTP Password: <input type="password" name="smtp_password" value="{{ cfg.smtp_password or '' }}"></label><br>
+    <label>From Email: <input type="text" name="from_email" value="{{ cfg.from_email or '' }}"></label><br>
+    <label>Use TLS: <select name="use_tls">
+        <option value="true" {% if cfg.use_tls == 'true' %}selected{% endif %}>Yes</option>
+        <option value="false" {% if cfg.use_tls == 'false' %}selected{% endif %}>No</option>
+    </select></label><br>
+    <button type="submit">Save</button>
+</form>
+""")
+
+
 @app.route("/admin/twilio", methods=["GET", "POST"])
 def twilio_admin() -> Any:
     message = ""
@@ -1831,17 +2523,7 @@ def twilio_admin() -> Any:
         twilio_config["auth_token"] = request.form.get("auth_token") or None
         twilio_config["from_number"] = request.form.get("from_number") or None
         message = "Configuration updated successfully."
-    html = """
-    <h1>Twilio Configuration</h1>
-    {% if message %}<p>{{ message }}</p>{% endif %}
-    <form method="post">
-        <label>Account SID: <input type="text" name="account_sid" value="{{ config.account_sid or '' }}"></label><br>
-        <label>Auth Token: <input type="text" name="auth_token" value="{{ config.auth_token or '' }}"></label><br>
-        <label>From Number: <input type="text" name="from_number" value="{{ config.from_number or '' }}"></label><br>
-        <button type="submit">Save</button>
-    </form>
-    """
-    return render_template_string(html, config=twilio_config, message=message)
+    return _TWILIO_ADMIN_TMPL.render(config=twilio_config, message=message)
 
 
 # Email configuration page
@@ -1864,23 +2546,7 @@ def email_admin() -> Any:
         use_tls_val = request.form.get("use_tls") or "true"
         email_config["use_tls"] = use_tls_val.lower()
         msg = "Email configuration updated successfully."
-    page = """
-    <h1>Email Configuration</h1>
-    {% if message %}<p>{{ message }}</p>{% endif %}
-    <form method="post">
-        <label>SMTP Server: <input type="text" name="smtp_server" value="{{ cfg.smtp_server or '' }}"></label><br>
-        <label>SMTP Port: <input type="text" name="smtp_port" value="{{ cfg.smtp_port or '' }}"></label><br>
-        <label>SMTP Username: <input type="text" name="smtp_username" value="{{ cfg.smtp_username or '' }}"></label><br>
-        <label>SMTP Password: <input type="password" name="smtp_password" value="{{ cfg.smtp_password or '' }}"></label><br>
-        <label>From Email: <input type="text" name="from_email" value="{{ cfg.from_email or '' }}"></label><br>
-        <label>Use TLS: <select name="use_tls">
-            <option value="true" {% if cfg.use_tls == 'true' %}selected{% endif %}>Yes</option>
-            <option value="false" {% if cfg.use_tls == 'false' %}selected{% endif %}>No</option>
-        </select></label><br>
-        <button type="submit">Save</button>
-    </form>
-    """
-    return render_template_string(page, cfg=email_config, message=msg)
+    return _EMAIL_ADMIN_TMPL.render(cfg=email_config, message=msg)
 
 
 # -----------------------------------------------------------------------------
@@ -1892,6 +2558,46 @@ def email_admin() -> Any:
 # functions used by the API endpoints to ensure the front‑end and API stay
 # synchronized.
 
+# Password hashing
+#
+# PBKDF2 keeps the stored hash within the 120 character ``password`` column.
+_PASSWORD_METHOD = "pbkdf2:sha256"
+
+
+def hash_password(password: str) -> str:
+    """Return a salted hash of ``password`` for storage on ``User.password``."""
+    return generate_password_hash(password, method=_PASSWORD_METHOD)
+
+
+# Hash methods produced by ``generate_password_hash``; stored values look
+# like ``method$salt$hash``.
+_HASH_METHODS = ("scrypt", "pbkdf2")
+
+
+def _is_password_hash(stored: str) -> bool:
+    """Return whether ``stored`` is a werkzeug password hash rather than plain text."""
+    return stored.count("$") == 2 and stored.startswith(_HASH_METHODS)
+
+
+def verify_password(user: User, password: str) -> bool:
+    """
+    Check ``password`` against the user's stored hash.  Accounts that still
+    hold a plain‑text password are accepted once and upgraded to a hash;
+    the plain‑text comparison is never applied to a stored hash, so the
+    hash string itself cannot be used as a password.
+
+    :param user: The user attempting to log in.
+    :param password: The password submitted on the login form.
+    """
+    if _is_password_hash(user.password):
+        return check_password_hash(user.password, password)
+    if hmac.compare_digest(user.password.encode(), password.encode()):
+        user.password = hash_password(password)
+        db.session.commit()
+        return True
+    return False
+
+
 @app.route("/register", methods=["GET", "POST"])
 def register() -> Any:
     """Render a registration form and create a new user.
@@ -1911,23 +2617,26 @@ def register() -> Any:
             return render_template("register.html", error="Email and password are required")
         # Use the email as the username internally
         username = email
-        # Check if a user with this email/username already exists
-        existing = User.query.filter_by(username=username).first()
-        if existing:
-            return render_template("register.html", error="An account with this email already exists")
         # Create the new user; address and license number are optional and will
         # default to empty strings.  Users can edit these later on their
         # profile page.
         new_user = User(
             username=username,
-            password=password,
+            password=hash_password(password),
             role=role,
             email=email,
             address="",  # set to empty; editable later
             license_number="",  # set to empty; editable later
         )
+        # The unique constraint on ``username`` rejects duplicate emails, so
+        # no separate lookup is needed before the insert
         db.session.add(new_user)
-        db.session.commit()
+        try:
+            db.session.commit()
+        except IntegrityError:
+            db.session.rollback()
+            return render_template("register.html", error="An account with this email already exists")
+        _cache_user_contact(new_user)
         login_user(new_user)
         return redirect(url_for("ui_dashboard"))
     return render_template("register.html")
@@ -1940,15 +2649,11 @@ def login() -> Any:
         # Use email as the username identifier
         email = request.form.get("email")
         password = request.form.get("password")
-        # Look up the user by either their username (stored as the email) or
-        # the separate email column (older schemas may have kept these
-        # distinct).  Use SQLAlchemy's ``or_`` operator to match either
-        # condition along with the provided password.
-        user = User.query.filter(
-            or_(User.username == email, User.email == email),
-            User.password == password,
-        ).first()
-        if user:
+        # Look up the user by their username (stored as the email), falling
+        # back to the separate email column (older schemas may have kept these
+        # distinct).  Each lookup is a single indexed equality match.
+        user = User.query.filter_by(username=email).first() or User.query.filter_by(email=email).first()
+        if user and verify_password(user, password):
             login_user(user)
             # After logging in, take the user to their dashboard if they have one
             return redirect(url_for("ui_dashboard"))
@@ -1967,9 +2672,15 @@ def logout() -> Any:
 def ui_home() -> Any:
     """Render a homepage listing all properties with links to view details."""
     # Pass current year for footer in home template to avoid UndefinedError
-    from datetime import datetime
-    current_year = datetime.now().year
-    return render_template("home.html", properties=properties, current_year=current_year)
+    current_year = _current_year()
+
+    def render() -> str:
+        return render_template("home.html", properties=properties, current_year=current_year)
+
+    # The header shows the logged‑in user, so only anonymous visits are cached
+    if current_user.is_authenticated:
+        return render()
+    return _cached_page("home", current_year, render)
 
 # --------------------------------------------------------------------------
 # Additional routes and aliases to support navigation links
@@ -1981,6 +2692,10 @@ def ui_home() -> Any:
 app.add_url_rule("/", endpoint="home", view_func=ui_home)
 
 # ------------------------------ Dashboard -----------------------------------
+# Buyer rating fields averaged on the dashboard, in display order
+_RATING_KEYS = ("rating_house", "rating_price", "rating_quality")
+
+
 @app.route("/dashboard")
 @login_required
 def ui_dashboard():
@@ -1992,58 +2707,70 @@ def ui_dashboard():
     page.
     """
     # Ensure the current user is an agent or seller; buyers are redirected
-    if hasattr(current_user, "role") and current_user.role not in {"seller", "listing_agent", "buyer_agent", "both_agent", "agent"}:
+    if hasattr(current_user, "role") and current_user.role not in _STAFF_ROLES:
         return redirect(url_for("ui_home"))
 
     # Collect properties owned or managed by the current user
-    my_props = []
-    for prop in properties.values():
-        # Each property record may store seller_id or agent_username depending on how it was created
-        seller_id = prop.get("seller_id")
-        agent_username = prop.get("agent_username")
-        if seller_id is not None and seller_id == current_user.id:
-            my_props.append(prop)
-        elif agent_username is not None and agent_username == getattr(current_user, "username", None):
-            my_props.append(prop)
-
-    # Gather property IDs for lookups
-    prop_ids = {p["id"] for p in my_props}
-
-    # Filter showings for these properties.  Note: showings is a dict; iterate over values.
-    my_showings = [show for show in showings.values() if show.get("property_id") in prop_ids]
-    # Sort showings chronologically by scheduled time (ISO string comparison suffices)
-    my_showings = sorted(my_showings, key=lambda s: s.get("scheduled_at", ""))
+    owned = _owned_properties(current_user)
+    my_props = list(owned.values())
+
+    # The merged index is keyed by property ID, so its keys serve directly
+    # as the ID set for the lookups below.
+    prop_ids = owned.keys()
+
+    # Collect showings for these properties in chronological order by merging
+    # the already sorted per‑property start‑time indexes
+    my_showings = [
+        showings[sid]
+        for _, sid in heapq.merge(*(_showing_starts.get(pid, ()) for pid in prop_ids))
+    ]
 
     # Filter disclosure packages and package share requests for these properties.  The
     # global variable ``packages`` stores package definitions keyed by package ID,
     # and ``package_shares`` stores share records keyed by share ID.  These lists
     # replace the previously undefined disclosure_packages and disclosure_requests.
-    my_packages = [pkg for pkg in packages.values() if pkg.get("property_id") in prop_ids]
-    my_pkg_requests = [req for req in package_shares.values() if req.get("property_id") in prop_ids]
-
-    # Filter feedback for these properties
-    my_feedback = [fb for fb in feedback if fb.get("property_id") in prop_ids]
+    my_packages = [pkg for pid in prop_ids for pkg in packages_by_property.get(pid, {}).values()]
+    my_pkg_requests = [req for pid in prop_ids for req in shares_by_property.get(pid, {}).values()]
+
+    # Collect feedback for these properties.  Feedback is stored per showing
+    # in ``feedback_store``, so tag each entry with its property for display.
+    my_feedback = [
+        {**fb, "property_id": show["property_id"], "kind": "showing"}
+        for show in my_showings
+        for fb in feedback_store.get(show["id"], ())
+    ]
 
-    # Compute simple statistics
-    def _avg(values):
-        # Helper to compute average ignoring None
-        vals = [v for v in values if v is not None]
-        return round(sum(vals) / len(vals), 2) if vals else None
+    # Compute simple statistics.  Average the three ratings in one pass over
+    # the feedback, ignoring missing or non‑numeric values (form submissions
+    # store ratings as strings).
+    sums = [0.0, 0.0, 0.0]
+    counts = [0, 0, 0]
+    for fb in my_feedback:
+        for i, key in enumerate(_RATING_KEYS):
+            value = fb.get(key)
+            if value is None or value == "":
+                continue
+            try:
+                sums[i] += float(value)
+            except (TypeError, ValueError):
+                continue
+            counts[i] += 1
+    avgs = [round(sums[i] / counts[i], 2) if counts[i] else None for i in range(3)]
 
     stats = {
         "properties": len(my_props),
         "showings_total": len(my_showings),
         "disclosures_total": len(my_pkg_requests),
         "feedback_total": len(my_feedback),
-        "avg_rating_house": _avg([fb.get("rating_house") for fb in my_feedback]),
-        "avg_rating_price": _avg([fb.get("rating_price") for fb in my_feedback]),
-        "avg_rating_quality": _avg([fb.get("rating_quality") for fb in my_feedback]),
+        "avg_rating_house": avgs[0],
+        "avg_rating_price": avgs[1],
+        "avg_rating_quality": avgs[2],
     }
 
     # Determine favourites for buyers
     my_favorites: List[Dict[str, Any]] = []
     if hasattr(current_user, "role") and current_user.role == "buyer":
-        fav_ids = favorites.get(current_user.id, set())
+        fav_ids = favorites.get(current_user.id, _EMPTY)
         # Build list of property dicts for the user's favourites
         for pid in fav_ids:
             prop = properties.get(pid)
@@ -2079,22 +2806,26 @@ def public_list() -> Any:
     public property page via its token.  The current year is passed
     for the footer in the template.
     """
-    from datetime import datetime
-    current_year = datetime.now().year
-    # Sort properties by name for display
-    sorted_properties = sorted(
-        properties.values(), key=lambda p: p.get("name", "")
-    )
+    current_year = _current_year()
     # Determine the current user's favourite properties if authenticated buyer
-    fav_set = set()
+    fav_set = _EMPTY
     if current_user.is_authenticated and getattr(current_user, "role", None) == "buyer":
-        fav_set = favorites.get(current_user.id, set())
-    return render_template(
-        "public_list.html",
-        properties=sorted_properties,
-        current_year=current_year,
-        favorites_set=fav_set,
-    )
+        fav_set = favorites.get(current_user.id, _EMPTY)
+
+    def render() -> str:
+        # Sort properties by name for display
+        sorted_properties = sorted(properties.values(), key=_by_name)
+        return render_template(
+            "public_list.html",
+            properties=sorted_properties,
+            current_year=current_year,
+            favorites_set=fav_set,
+        )
+
+    # Pages with favourites marked are per‑user and are not cached
+    if fav_set:
+        return render()
+    return _cached_page("public_list", current_year, render)
 
 
 # -----------------------------------------------------------------------------
@@ -2111,70 +2842,99 @@ def public_list() -> Any:
 def ui_profile() -> Any:
     """Render and handle updates to the logged‑in user's profile."""
     user: User = current_user  # type: ignore[assignment]
-    if request.method == "POST":
+    error = None
+    avatar_error = f"Profile picture must be at most {app.config['MAX_AVATAR_BYTES'] // 1024} KB"
+    if request.method == "POST" and (request.content_length or 0) > app.config["MAX_AVATAR_BYTES"]:
+        # Refuse oversized uploads from the declared length, before the body
+        # is parsed and spooled to disk
+        error = avatar_error
+    elif request.method == "POST":
         # Update user fields from form
         # Email is required for agents and sellers but optional for other roles
         email = request.form.get("email")
         address = request.form.get("address")
         license_number = request.form.get("license")
-        # Update the SQLAlchemy model
-        user.email = email
-        user.address = address
-        user.license_number = license_number
+        # Update the SQLAlchemy model, touching only fields whose value changed
+        changed = False
+        for field, value in (("email", email), ("address", address), ("license_number", license_number)):
+            if getattr(user, field) != value:
+                setattr(user, field, value)
+                changed = True
         # Handle profile picture upload
         file = request.files.get("picture")
         if file and file.filename:
             filename = secure_filename(file.filename)
-            user.avatar_filename = filename
-            profile_pics[user.id] = {"filename": filename, "content": file.read()}
-        db.session.commit()
-        # Reload in‑memory structures from DB to reflect changes
-        load_db_into_memory()
-    # Collect properties owned or managed by the current user
-    my_props = []
-    for prop in properties.values():
-        seller_id = prop.get("seller_id")
-        agent_username = prop.get("agent_username")
-        if seller_id is not None and seller_id == user.id:
-            my_props.append(prop)
-        elif agent_username is not None and agent_username == getattr(user, "username", None):
-            my_props.append(prop)
-    prop_ids = {p["id"] for p in my_props}
-    # Gather upcoming showings across all managed properties
-    upcoming_showings = [s for s in showings if s.get("property_id") in prop_ids]
-    # Sort showings by scheduled time ascending
-    upcoming_showings = sorted(
-        upcoming_showings,
-        key=lambda s: s.get("scheduled_at", "")
-    )
-    # Determine if a profile picture exists for this user
+            if not save_avatar(user.id, filename, file):
+                error = avatar_error
+            elif user.avatar_filename != filename:
+                user.avatar_filename = filename
+                changed = True
+        # Resubmitting an unchanged form needs no database write
+        if changed:
+            db.session.commit()
+            # Only this user's record changed; refresh its cached contact
+            # details rather than reloading every in‑memory store
+            _cache_user_contact(user)
+    # Reuse the last rendering of this user's page unless something it shows
+    # has changed since
     pic_info = profile_pics.get(user.id)
-    # Prepare base64‑encoded image data for the template if a picture exists
-    img_data = None
+    cache_key = (
+        _PROP_REV, _SHOWING_REV, _FAV_REV,
+        user.username, user.email, user.address, user.license_number,
+        pic_info.get("version") if pic_info else None,
+    )
+    cached = _profile_cache.get(user.id)
+    if cached is not None and cached[0] == cache_key and error is None:
+        return cached[1]
+    # Collect properties owned or managed by the current user
+    owned = _owned_properties(user)
+    my_props = list(owned.values())
+    prop_ids = owned.keys()
+    # Gather showings across all managed properties in chronological order
+    # by merging the already sorted per‑property start‑time indexes
+    upcoming_showings = [
+        showings[sid]
+        for _, sid in heapq.merge(*(_showing_starts.get(pid, ()) for pid in prop_ids))
+    ]
+    # Link to the profile picture if one exists; the image itself is served
+    # by ``profile_pic`` so the page does not embed it
+    img_url = None
     if pic_info:
-        try:
-            import base64  # late import to avoid unused import when no image
-            img_data = (
-                "data:image/" + pic_info.get("filename", "").split(".")[-1] + ";base64," +
-                base64.b64encode(pic_info.get("content", b" ")).decode("utf-8")
-            )
-        except Exception:
-            img_data = None
+        img_url = url_for("profile_pic", user_id=user.id, v=pic_info.get("version"))
     # Determine favourite properties for this user
-    fav_ids = favorites.get(user.id, set())
-    fav_props: List[Dict[str, Any]] = []
-    for pid in fav_ids:
-        prop = properties.get(pid)
-        if prop:
-            fav_props.append(prop)
-    return render_template(
+    fav_props = [
+        prop for pid in favorites.get(user.id, _EMPTY)
+        if (prop := properties.get(pid)) is not None
+    ]
+    html = render_template(
         "profile.html",
         user=user,
         properties=my_props,
         showings=upcoming_showings,
-        picture=img_data,
+        picture=img_url,
         favorites=fav_props,
+        error=error,
     )
+    if error is None:
+        _profile_cache[user.id] = (cache_key, html)
+    return html
+
+@app.route("/profile_pic/<int:user_id>")
+def profile_pic(user_id: int) -> Any:
+    """Serve a user's uploaded profile picture.
+
+    Profile pages link here with the picture's random version string in the
+    query string, so a new upload gets a new URL and browsers may cache each
+    version indefinitely.
+    """
+    pic_info = profile_pics.get(user_id)
+    if not pic_info:
+        return "Picture not found", 404
+    mimetype = mimetypes.guess_type(pic_info.get("filename", ""))[0] or "application/octet-stream"
+    response = send_file(pic_info["path"], mimetype=mimetype, max_age=86400)
+    response.cache_control.public = True
+    response.cache_control.immutable = True
+    return response
 
 # -------------------------------------------------------------------------
 # Guest request flow
@@ -2200,10 +2960,7 @@ guest_requests: Dict[str, Dict[str, Any]] = {}
 # Utility to find a property record by its public token.  Returns
 # the property dictionary or None if not found.
 def _find_property_by_token(token: str) -> Optional[Dict[str, Any]]:
-    for prop in properties.values():
-        if prop.get("public_token") == token:
-            return prop
-    return None
+    return properties_by_token.get(token)
 
 @app.route("/request_access/<public_token>", methods=["GET", "POST"])
 def request_access(public_token: str) -> Any:
@@ -2227,8 +2984,7 @@ def request_access(public_token: str) -> Any:
     if not prop:
         return "Property not found", 404
     # Determine current year for footer
-    from datetime import datetime
-    current_year = datetime.now().year
+    current_year = _current_year()
     if request.method == "POST":
         name = request.form.get("name", "").strip()
         phone = request.form.get("phone", "").strip()
@@ -2241,7 +2997,6 @@ def request_access(public_token: str) -> Any:
                 error="Name and phone number are required.",
                 current_year=current_year,
             )
-        import uuid
         req_id = uuid.uuid4().hex
         guest_requests[req_id] = {
             "id": req_id,
@@ -2252,38 +3007,30 @@ def request_access(public_token: str) -> Any:
             "role": role,
             "email": email or None,
             "status": "pending",
-            "created_at": datetime.utcnow().isoformat(),
+            "created_at": g.now.isoformat(),
             "access_link": None,
         }
-        # Notify listing agent/seller (if configured) via SMS/email
-        # Determine contact details for seller/agent
+        # Notify listing agent/seller (if configured) by email; user accounts
+        # carry no phone number, so there is no SMS to send
         seller_id = prop.get("seller_id")
         agent_username = prop.get("agent_username")
-        contact_name = None
-        contact_phone = None
         contact_email = None
         if seller_id:
-            seller = User.query.get(seller_id)
-            if seller:
-                contact_name = seller.username
-                contact_phone = getattr(seller, "seller_phone", None)
-                contact_email = seller.email
+            contact = _user_contact(user_id=seller_id)
         elif agent_username:
             # Agent username corresponds to a user with that username
-            agent = User.query.filter_by(username=agent_username).first()
-            if agent:
-                contact_name = agent.username
-                contact_phone = getattr(agent, "agent_phone", None)
-                contact_email = agent.email
+            contact = _user_contact(username=agent_username)
+        else:
+            contact = None
+        if contact:
+            _, contact_email = contact
         # Compose message
         msg = (
             f"New access request for property {prop.get('name')} by {name}. "
             f"Phone: {phone}. Role: {role}."
         )
         if contact_email:
-            send_email(contact_email, f"New access request for {prop.get('name')}", msg)
-        if contact_phone:
-            send_sms(contact_phone, msg)
+            notify_email(contact_email, f"New access request for {prop.get('name')}", msg)
         return render_template(
             "request_access.html",
             property=prop,
@@ -2307,26 +3054,16 @@ def list_guest_requests() -> Any:
     Only sellers, listing agents, buyer agents or both agents can view
     requests.  Buyers are redirected to the home page.
     """
-    if not hasattr(current_user, "role") or current_user.role not in {
-        "seller", "listing_agent", "buyer_agent", "both_agent", "agent"
-    }:
+    if not hasattr(current_user, "role") or current_user.role not in _STAFF_ROLES:
         return redirect(url_for("ui_home"))
     # Build a list of requests where the property belongs to current user
     # Determine property IDs managed by current user
-    prop_ids: Set[str] = set()
-    for prop in properties.values():
-        seller_id = prop.get("seller_id")
-        agent_username = prop.get("agent_username")
-        if seller_id and seller_id == current_user.id:
-            prop_ids.add(prop["id"])
-        elif agent_username and agent_username == getattr(current_user, "username", None):
-            prop_ids.add(prop["id"])
+    prop_ids = _owned_properties(current_user).keys()
     # Filter guest requests for these properties
     requests_for_user = [r for r in guest_requests.values() if r.get("property_id") in prop_ids]
     # Sort by created_at descending
     requests_for_user.sort(key=lambda r: r.get("created_at", ""), reverse=True)
-    from datetime import datetime
-    current_year = datetime.now().year
+    current_year = _current_year()
     return render_template(
         "guest_requests.html",
         requests=requests_for_user,
@@ -2345,9 +3082,7 @@ def approve_guest_request(req_id: str) -> Any:
     endpoint will be redirected to home.  After approval, the user
     is redirected back to the guest requests page.
     """
-    if not hasattr(current_user, "role") or current_user.role not in {
-        "seller", "listing_agent", "buyer_agent", "both_agent", "agent"
-    }:
+    if not hasattr(current_user, "role") or current_user.role not in _STAFF_ROLES:
         return redirect(url_for("ui_home"))
     req = guest_requests.get(req_id)
     if not req:
@@ -2356,12 +3091,7 @@ def approve_guest_request(req_id: str) -> Any:
     prop = properties.get(req.get("property_id"))
     if not prop:
         return "Property not found", 404
-    seller_id = prop.get("seller_id")
-    agent_username = prop.get("agent_username")
-    if not (
-        (seller_id and seller_id == current_user.id)
-        or (agent_username and agent_username == getattr(current_user, "username", None))
-    ):
+    if not _manages_property(current_user, prop):
         return "Unauthorized", 403
     # Approve if pending
     if req.get("status") == "pending":
@@ -2376,9 +3106,9 @@ def approve_guest_request(req_id: str) -> Any:
             f"You can access the showing calendar and disclosures here: {access_link}"
         )
         if req.get("email"):
-            send_email(req["email"], f"Access approved for {prop.get('name')}", msg)
+            notify_email(req["email"], f"Access approved for {prop.get('name')}", msg)
         # Use phone if available for SMS
-        send_sms(req.get("phone"), msg)
+        notify_sms(req.get("phone"), msg)
     return redirect(url_for("list_guest_requests"))
 
 @app.route("/guest_requests/<req_id>/decline", methods=["POST"])
@@ -2390,9 +3120,7 @@ def decline_guest_request(req_id: str) -> Any:
     possible.  Only sellers/agents can decline.  After declining,
     redirects back to the guest requests page.
     """
-    if not hasattr(current_user, "role") or current_user.role not in {
-        "seller", "listing_agent", "buyer_agent", "both_agent", "agent"
-    }:
+    if not hasattr(current_user, "role") or current_user.role not in _STAFF_ROLES:
         return redirect(url_for("ui_home"))
     req = guest_requests.get(req_id)
     if not req:
@@ -2401,12 +3129,7 @@ def decline_guest_request(req_id: str) -> Any:
     prop = properties.get(req.get("property_id"))
     if not prop:
         return "Property not found", 404
-    seller_id = prop.get("seller_id")
-    agent_username = prop.get("agent_username")
-    if not (
-        (seller_id and seller_id == current_user.id)
-        or (agent_username and agent_username == getattr(current_user, "username", None))
-    ):
+    if not _manages_property(current_user, prop):
         return "Unauthorized", 403
     if req.get("status") == "pending":
         req["status"] = "declined"
@@ -2415,8 +3138,8 @@ def decline_guest_request(req_id: str) -> Any:
             "Please contact the listing agent for further information."
         )
         if req.get("email"):
-            send_email(req["email"], f"Access declined for {prop.get('name')}", msg)
-        send_sms(req.get("phone"), msg)
+            notify_email(req["email"], f"Access declined for {prop.get('name')}", msg)
+        notify_sms(req.get("phone"), msg)
     return redirect(url_for("list_guest_requests"))
 
 @app.route("/manage-showings")
@@ -2428,6 +3151,90 @@ def manage_showings() -> Any:
     """
     return redirect(url_for("ui_home"))
 
+# Start hours of the bookable one‑hour slots on schedule pages (8am to 7pm)
+# and their display labels, which are the same every day
+_SLOT_HOURS = range(8, 20)
+# Slot labels and ``THH:MM`` timestamp suffixes depend only on the hour, so
+# they are formatted once at import time.
+_HOUR_LABELS: Tuple[str, ...] = tuple(
+    datetime(2000, 1, 1, hour).strftime("%-I:%M %p") for hour in _SLOT_HOURS
+)
+_HOUR_SUFFIXES: Tuple[str, ...] = tuple(f"T{hour:02d}:00" for hour in _SLOT_HOURS)
+
+
+@lru_cache(maxsize=1)
+def _week_skeleton(first_day: date) -> Tuple[Tuple[str, Tuple[Tuple[datetime, str, str], ...]], ...]:
+    """
+    Return the seven days of bookable slots starting at ``first_day`` as
+    ``(day label, ((start, iso timestamp, hour label), ...))`` pairs.
+
+    The skeleton is the same for every property, so it is built once per day
+    and schedule pages only work out which slots are available.
+    """
+    week = []
+    for offset in range(7):
+        day_date = first_day + timedelta(days=offset)
+        day_iso = day_date.isoformat()
+        slots = tuple(
+            (datetime(day_date.year, day_date.month, day_date.day, hour), day_iso + suffix, label)
+            for hour, suffix, label in zip(_SLOT_HOURS, _HOUR_SUFFIXES, _HOUR_LABELS)
+        )
+        week.append((day_date.strftime("%a %b %d"), slots))
+    return tuple(week)
+
+
+def _week_grid(property_id: str) -> Tuple[Tuple[Any, ...], bytes]:
+    """
+    Return the coming week's slots for a property's schedule page as the
+    shared ``_week_skeleton`` and an availability map holding one byte per
+    slot in day then hour order: 1 when the slot is free, 0 when a showing
+    or blocked period covers it.  Templates index the map with
+    ``loop.index0`` of both loops.
+
+    Each showing occupies one hour.  Showings and blocked periods are merged
+    into one sorted set of busy intervals so each slot is a single bisect.
+    The map is cached per property until the day rolls over or the
+    property's busy times change.
+    """
+    key = (date.today(), _schedule_rev[property_id])
+    week = _week_skeleton(key[0])
+    cached = _week_grid_cache.get(property_id)
+    if cached is not None and cached[0] == key:
+        return week, cached[1]
+    busy: List[Tuple[datetime, datetime]] = list(blocked_times.get(property_id, []))
+    busy.extend(
+        (start_dt, start_dt + timedelta(hours=1))
+        for start_dt, _ in _showing_starts.get(property_id, ())
+    )
+    busy_starts, busy_ends = _interval_union(busy)
+    availability = bytes(
+        not _interval_covers(busy_starts, busy_ends, slot_dt)
+        for _, slots in week
+        for slot_dt, _, _ in slots
+    )
+    _week_grid_cache[property_id] = (key, availability)
+    return week, availability
+
+
+def _week_slots(property_id: str) -> List[Dict[str, Any]]:
+    """
+    Expand ``_week_grid`` into the per‑day ``week_slots`` list of
+    ``{"date", "times": [{"iso", "label", "available"}]}`` dicts that the
+    public property template renders.
+    """
+    week, availability = _week_grid(property_id)
+    flags = iter(availability)
+    return [
+        {
+            "date": day_label,
+            "times": [
+                {"iso": iso_ts, "label": label, "available": bool(next(flags))}
+                for _, iso_ts, label in slots
+            ],
+        }
+        for day_label, slots in week
+    ]
+
 # --------------------------------------------------------------------------
 # Public listing routes
 #
@@ -2449,53 +3256,19 @@ def public_property(public_token: str) -> Any:
     in the disclosure request form.
     """
     # Find the property by its public token
-    prop_id = None
-    for pid, prop in properties.items():
-        if prop.get("public_token") == public_token:
-            prop_id = pid
-            break
-    if not prop_id:
+    prop = _find_property_by_token(public_token)
+    if not prop:
         return "Property not found", 404
-    prop = properties.get(prop_id)
+    prop_id = prop["id"]
     # Determine if the logged‑in user (buyer) has favourited this property
     is_favorite = False
     if current_user.is_authenticated and getattr(current_user, "role", None) == "buyer":
-        fav_set = favorites.get(current_user.id, set())
+        fav_set = favorites.get(current_user.id, _EMPTY)
         is_favorite = prop_id in fav_set
     # Build weekly slots (8am–8pm) like the seller view
-    from datetime import date, time
-    today = date.today()
-    week_slots: List[Dict[str, Any]] = []
-    for offset in range(7):
-        day_date = today + timedelta(days=offset)
-        day_label = day_date.strftime("%a %b %d")
-        times_list: List[Dict[str, Any]] = []
-        for hour in range(8, 20):  # 8am to 7pm start times
-            slot_dt = datetime.combine(day_date, time(hour, 0))
-            iso_ts = slot_dt.strftime("%Y-%m-%dT%H:%M")
-            available = True
-            # Check existing showings
-            for s in showings.values():
-                if s["property_id"] == prop_id:
-                    start_dt = s["scheduled_at"] if isinstance(s["scheduled_at"], datetime) else datetime.fromisoformat(str(s["scheduled_at"]))
-                    end_dt = start_dt + timedelta(hours=1)
-                    if start_dt <= slot_dt < end_dt:
-                        available = False
-                        break
-            # Check blocked times
-            if available:
-                for b_start, b_end in blocked_times.get(prop_id, []):
-                    if b_start <= slot_dt < b_end:
-                        available = False
-                        break
-            times_list.append({
-                "iso": iso_ts,
-                "label": slot_dt.strftime("%-I:%M %p"),
-                "available": available,
-            })
-        week_slots.append({"date": day_label, "times": times_list})
+    week_slots = _week_slots(prop_id)
     # Filter packages for this property that are marked public
-    property_packages = [pkg for pkg in packages.values() if pkg["property_id"] == prop_id and pkg.get("is_public")]
+    property_packages = [pkg for pkg in packages_by_property.get(prop_id, {}).values() if pkg.get("is_public")]
     return render_template(
         "public_property.html",
         property=prop,
@@ -2514,14 +3287,10 @@ def public_schedule_slot(public_token: str, scheduled_at: str) -> Any:
     triggers notifications/approvals as in the authenticated flow.
     """
     # Find property by token
-    prop_id = None
-    for pid, prop in properties.items():
-        if prop.get("public_token") == public_token:
-            prop_id = pid
-            break
-    if not prop_id:
+    prop = _find_property_by_token(public_token)
+    if not prop:
         return "Property not found", 404
-    prop = properties.get(prop_id)
+    prop_id = prop["id"]
     try:
         slot_dt = datetime.fromisoformat(scheduled_at)
     except Exception:
@@ -2544,82 +3313,80 @@ def public_schedule_slot(public_token: str, scheduled_at: str) -> Any:
             )
         start = slot_dt
         end = start + timedelta(hours=1)
-        # Check availability
-        if is_time_blocked(prop_id, start, end) or has_conflict(prop_id, start, end):
-            return render_template(
-                "schedule_slot.html",
-                property=prop,
-                property_id=prop_id,
-                scheduled_at=scheduled_at,
-                error="This slot is no longer available",
-            )
-        # Create showing
-        showing_id = str(uuid.uuid4())
-        showings[showing_id] = {
-            "id": showing_id,
-            "property_id": prop_id,
-            "scheduled_at": start,
-            "status": "pending",
-            "client_name": client_name,
-            "client_phone": client_phone,
-            "client_email": client_email,
-        }
+        # Check availability and claim the slot atomically
+        with _prop_locks[prop_id]:
+            if is_time_blocked(prop_id, start, end) or has_conflict(prop_id, start, end):
+                return render_template(
+                    "schedule_slot.html",
+                    property=prop,
+                    property_id=prop_id,
+                    scheduled_at=scheduled_at,
+                    error="This slot is no longer available",
+                )
+            # Create showing, already approved with a lockbox code if the
+            # property auto‑approves, so the row is written once in its final state
+            showing_id = uuid.uuid4().hex
+            s = {
+                "id": showing_id,
+                "property_id": prop_id,
+                "scheduled_at": start,
+                "status": "pending",
+                "client_name": client_name,
+                "client_phone": client_phone,
+                "client_email": client_email,
+            }
+            auto = bool(prop.get("auto_approve_showings"))
+            if auto:
+                s["lockbox_code"] = generate_lockbox_code()
+                s["code_expires_at"] = start + timedelta(hours=1, minutes=15)
+                s["status"] = "approved"
+            _add_showing(s)
         # Persist to DB
-        db_showing = ShowingModel(
-            id=showing_id,
-            property_id=prop_id,
-            client_name=client_name,
-            client_phone=client_phone,
-            client_email=client_email,
-            scheduled_at=start,
-            status="pending",
-        )
-        db.session.add(db_showing)
+        db.session.add(_showing_model(s))
         db.session.commit()
-        # Send notifications and log event using existing code
+        # Send notifications and log event using existing code.  Messages are
+        # collected into one SMS and one email batch and queued together at
+        # the end, including the approval notices when auto‑approved.
+        sms: List[Tuple[str, str]] = []
+        emails: List[Tuple[str, str, str]] = []
         try:
-            buyer_msg = f"Your showing request for {prop['name']} on {start.strftime('%Y-%m-%d %H:%M')} has been received and is pending approval."
+            when = start.strftime(_WHEN_FORMAT)
             if client_phone:
-                send_sms(client_phone, buyer_msg)
+                sms.append((client_phone, _SMS_REQUEST_RECEIVED(prop=prop["name"], when=when)))
             if client_email:
-                send_email(client_email, "Showing request received", buyer_msg)
-            contact_msg = f"New showing request for {prop['name']} at {start.strftime('%Y-%m-%d %H:%M')} from {client_name}."
-            for contact in [prop.get("seller_phone"), prop.get("agent_phone")]:
-                if contact:
-                    send_sms(contact, contact_msg)
-            for contact in [prop.get("seller_email"), prop.get("agent_email")]:
-                if contact:
-                    send_email(contact, "New showing request", contact_msg)
+                emails.append((
+                    client_email,
+                    "Showing request received",
+                    _EMAIL_REQUEST_RECEIVED(name=client_name, prop=prop["name"], when=when),
+                ))
+            contact_msg = _NOTIFY_REQUESTED(prop=prop["name"], name=client_name, when=when, showing_id=showing_id)
+            contact_sms, contact_emails = _stakeholder_batch(prop, _prop_subject(prop_id, _SUBJ_REQUESTED), contact_msg)
+            sms += contact_sms
+            emails += contact_emails
             log_event(prop_id, "showing_requested", {"showing_id": showing_id, "client_name": client_name, "scheduled_at": start.isoformat()})
-            # Auto approve if configured
-            if prop.get("auto_approve_showings"):
-                s = showings[showing_id]
-                code = generate_lockbox_code()
-                s["lockbox_code"] = code
-                s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
-                s["status"] = "approved"
-                when2 = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-                code_str = s["lockbox_code"]
-                expires_str = s["code_expires_at"].strftime("%Y-%m-%d %H:%M")
+            # Notify about the auto approval
+            if auto:
+                code = s["lockbox_code"]
+                expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
                 if client_phone:
-                    send_sms(client_phone, f"Your showing for {prop['name']} at {when2} has been approved. Lockbox code: {code_str} (expires {expires_str}).")
+                    sms.append((client_phone, _SMS_APPROVED(prop=prop["name"], when=when, code=code, exp=expires)))
                 if client_email:
-                    send_email(client_email, "Showing approved", f"Hello {client_name},\n\nYour showing for {prop['name']} at {when2} has been approved.\nYour lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you.")
-                msg_notify = (
-                    f"Showing for {prop['name']} on {when2} was automatically approved.\n"
-                    f"Buyer: {client_name}. Lockbox code: {code_str} (expires {expires_str}).\n"
-                    f"Showing ID: {showing_id}"
+                    emails.append((
+                        client_email,
+                        "Showing approved",
+                        _EMAIL_APPROVED(name=client_name, prop=prop["name"], when=when, code=code, exp=expires),
+                    ))
+                msg_notify = _NOTIFY_AUTO_APPROVED(
+                    prop=prop["name"], when=when, name=client_name, code=code, exp=expires, showing_id=showing_id
                 )
-                subj_notify = f"Showing auto‑approved for {prop['name']}"
-                for contact in [prop.get("seller_phone"), prop.get("agent_phone")]:
-                    if contact:
-                        send_sms(contact, msg_notify)
-                for contact in [prop.get("seller_email"), prop.get("agent_email")]:
-                    if contact:
-                        send_email(contact, subj_notify, msg_notify)
+                subj_notify = _prop_subject(prop_id, _SUBJ_AUTO_APPROVED)
+                contact_sms, contact_emails = _stakeholder_batch(prop, subj_notify, msg_notify)
+                sms += contact_sms
+                emails += contact_emails
                 log_event(prop_id, "showing_approved", {"showing_id": showing_id, "client_name": client_name, "scheduled_at": start.isoformat(), "lockbox_code": code, "auto": True})
         except Exception:
             pass
+        notify_bulk(sms, emails)
         # Optionally store ratings for the property (if provided).  We attach them
         # as feedback entries keyed by showing ID so sellers can see buyer
         # sentiment later.
@@ -2631,6 +3398,7 @@ def public_schedule_slot(public_token: str, scheduled_at: str) -> Any:
                 "comment": None,
                 "timestamp": datetime.utcnow(),
             })
+            feedback_count_by_property[prop_id] += 1
         return redirect(url_for("public_property", public_token=public_token))
     # GET: show form
     return render_template(
@@ -2653,14 +3421,10 @@ def public_request_package(public_token: str) -> Any:
     buyer accordingly.
     """
     # Find property by token
-    prop_id = None
-    for pid, prop in properties.items():
-        if prop.get("public_token") == public_token:
-            prop_id = pid
-            break
-    if not prop_id:
+    prop = _find_property_by_token(public_token)
+    if not prop:
         return "Property not found", 404
-    prop = properties.get(prop_id)
+    prop_id = prop["id"]
     pkg_id = request.form.get("package_id")
     buyer_name = request.form.get("buyer_name")
     buyer_phone = request.form.get("buyer_phone")
@@ -2672,8 +3436,8 @@ def public_request_package(public_token: str) -> Any:
         return redirect(url_for("public_property", public_token=public_token))
     # Determine auto approval based on property setting
     auto = not prop.get("requires_disclosure_approval")
-    share_id = str(uuid.uuid4())
-    package_shares[share_id] = {
+    share_id = uuid.uuid4().hex
+    _add_share({
         "id": share_id,
         "package_id": pkg_id,
         "property_id": prop_id,
@@ -2682,50 +3446,37 @@ def public_request_package(public_token: str) -> Any:
         "buyer_email": buyer_email,
         "downloads": [],
         "approved": auto,
-    }
-    # Notify seller/agent
+    })
+    # Notify seller/agent.  Messages are collected into one SMS and one email
+    # batch and queued together before redirecting.
+    sms: List[Tuple[str, str]] = []
+    emails: List[Tuple[str, str, str]] = []
+    prop_name = prop.get("name", prop_id)
     try:
-        prop_name = prop.get("name", prop_id)
         if auto:
-            msg = (
-                f"Disclosure package '{pkg['name']}' for {prop_name} was automatically shared with buyer {buyer_name}."
-                f" (Share ID: {share_id})"
-            )
-            subj = f"Disclosure package shared for {prop_name}"
+            msg = _NOTIFY_SHARE_AUTO(pkg=pkg["name"], prop=prop_name, buyer=buyer_name, share_id=share_id)
+            subj = _SUBJ_SHARE_AUTO(prop=prop_name)
         else:
-            msg = (
-                f"Buyer {buyer_name} has requested access to disclosure package '{pkg['name']}' for {prop_name}.\n"
-                f"Approve the share via your dashboard. Share ID: {share_id}."
-            )
-            subj = f"Disclosure access request for {prop_name}"
-        for contact in [prop.get("seller_phone"), prop.get("agent_phone")]:
-            if contact:
-                send_sms(contact, msg)
-        for contact in [prop.get("seller_email"), prop.get("agent_email")]:
-            if contact:
-                send_email(contact, subj, msg)
+            msg = _NOTIFY_SHARE_REQUESTED(buyer=buyer_name, pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            subj = _SUBJ_SHARE_REQUESTED(prop=prop_name)
+        sms, emails = _stakeholder_batch(prop, subj, msg)
     except Exception:
         pass
     # Notify buyer
     try:
         if auto:
-            buyer_msg = (
-                f"You have been granted access to disclosure package '{pkg['name']}' for {prop['name']}'.\n"
-                f"Use your share ID {share_id} to download the files."
-            )
-            buyer_subj = f"Disclosure package available for {prop['name']}"
+            buyer_msg = _BUYER_SHARE_GRANTED(pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            buyer_subj = _BUYER_SUBJ_SHARE_GRANTED(prop=prop_name)
         else:
-            buyer_msg = (
-                f"Your request to access disclosure package '{pkg['name']}' for {prop['name']}' has been received and is pending approval.\n"
-                f"You will be notified when access is granted."
-            )
-            buyer_subj = f"Disclosure access request received for {prop['name']}"
+            buyer_msg = _BUYER_SHARE_PENDING(pkg=pkg["name"], prop=prop_name)
+            buyer_subj = _BUYER_SUBJ_SHARE_PENDING(prop=prop_name)
         if buyer_phone:
-            send_sms(buyer_phone, buyer_msg)
+            sms.append((buyer_phone, buyer_msg))
         if buyer_email:
-            send_email(buyer_email, buyer_subj, buyer_msg)
+            emails.append((buyer_email, buyer_subj, buyer_msg))
     except Exception:
         pass
+    notify_bulk(sms, emails)
     # Log share creation
     try:
         log_event(prop_id, "share_created", {"share_id": share_id, "package_id": pkg_id, "buyer_name": buyer_name, "auto": auto})
@@ -2788,7 +3539,8 @@ def favorite_property(property_id: str) -> Any:
     if getattr(current_user, "role", None) != "buyer":
         return redirect(url_for("ui_home"))
     # Ensure the property exists
-    if property_id not in properties:
+    prop = properties.get(property_id)
+    if prop is None:
         return "Property not found", 404
     # Get or create the favourites set for this user
     fav_set = favorites.setdefault(current_user.id, set())
@@ -2797,12 +3549,13 @@ def favorite_property(property_id: str) -> Any:
         fav_set.remove(property_id)
     else:
         fav_set.add(property_id)
+    global _FAV_REV
+    _FAV_REV += 1
     # Redirect back to referrer or fallback to public property
     ref = request.referrer
     if ref:
         return redirect(ref)
     # Fallback if no referrer
-    prop = properties[property_id]
     return redirect(url_for("public_property", public_token=prop.get("public_token")))
 
 
@@ -2832,14 +3585,15 @@ def ui_create_property() -> Any:
             return False
         auto_approve = parse_bool(request.form.get("auto_approve_showings"))
         req_disc_approval = parse_bool(request.form.get("requires_disclosure_approval"))
-        prop_id = str(uuid.uuid4())
+        prop_id = uuid.uuid4().hex
         # Generate a unique public token for buyers to access the public schedule
         public_token = uuid.uuid4().hex
-        # Determine seller for this property.  If the logged‑in user is a seller,
-        # assign them; otherwise assign the current agent (so sellers can later
-        # approve showings/disclosures).
-        seller_id = current_user.id if current_user.role == "seller" else current_user.id
-        properties[prop_id] = {
+        # The creating user is recorded as the property's seller whether they
+        # are the seller or an agent, so they can later approve showings and
+        # disclosures.  (Both branches of the earlier role check assigned
+        # ``current_user.id``.)
+        seller_id = current_user.id
+        _add_property({
             "id": prop_id,
             "name": name,
             "address": address,
@@ -2854,7 +3608,7 @@ def ui_create_property() -> Any:
             "requires_disclosure_approval": req_disc_approval,
             "seller_id": seller_id,
             "public_token": public_token,
-        }
+        })
         # Persist the property in the database
         db_prop = PropertyModel(
             id=prop_id,
@@ -2871,7 +3625,7 @@ def ui_create_property() -> Any:
         )
         db.session.add(db_prop)
         db.session.commit()
-        return redirect(url_for("ui_property_detail", property_id=prop_id))
+        return redirect(_property_detail_url(prop_id))
     return render_template("create_property.html")
 
 
@@ -2882,50 +3636,18 @@ def ui_property_detail(property_id: str) -> Any:
     prop = properties.get(property_id)
     if not prop:
         return "Property not found", 404
-    # Gather showings for this property
-    property_showings = [s for s in showings.values() if s["property_id"] == property_id]
-    # Sort showings by scheduled time
-    property_showings.sort(key=lambda s: s["scheduled_at"])
+    # Gather showings for this property in scheduled order from the sorted
+    # start‑time index
+    prop_showings = showings_by_property.get(property_id, {})
+    property_showings = [prop_showings[sid] for _, sid in _showing_starts.get(property_id, ())]
     # Gather packages and shares for this property
-    property_packages = [pkg for pkg in packages.values() if pkg["property_id"] == property_id]
-    property_shares = [sh for sh in package_shares.values() if sh["property_id"] == property_id]
+    property_packages = list(packages_by_property.get(property_id, {}).values())
+    property_shares = list(shares_by_property.get(property_id, {}).values())
     # List uploaded disclosure files
     files = list(disclosures.get(property_id, {}).keys())
-    # Build a weekly schedule (next 7 days, default 8am-8pm) to display as calendar slots
-    # If you wish to change the default hours, adjust the range below.
-    from datetime import datetime, timedelta, time, date
-    today = date.today()
-    week_slots: List[Dict[str, Any]] = []
-    for offset in range(7):
-        day_date = today + timedelta(days=offset)
-        day_label = day_date.strftime("%a %b %d")
-        times_list: List[Dict[str, Any]] = []
-        # Hours 8 through 19 (8am to 7pm start times). Adjust end+1 for inclusive end.
-        for hour in range(8, 20):
-            slot_dt = datetime.combine(day_date, time(hour, 0))
-            iso_ts = slot_dt.strftime("%Y-%m-%dT%H:%M")
-            available = True
-            # Check conflicts with existing showings (one‑hour duration)
-            for s in showings.values():
-                if s["property_id"] == property_id:
-                    start_dt = datetime.fromisoformat(s["scheduled_at"])
-                    end_dt = start_dt + timedelta(hours=1)
-                    if start_dt <= slot_dt < end_dt:
-                        available = False
-                        break
-            # Check blocked times
-            if available:
-                for b_start, b_end in blocked_times.get(property_id, []):
-                    # b_start and b_end are datetime objects
-                    if b_start <= slot_dt < b_end:
-                        available = False
-                        break
-            times_list.append({
-                "iso": iso_ts,
-                "label": slot_dt.strftime("%-I:%M %p"),
-                "available": available,
-            })
-        week_slots.append({"date": day_label, "times": times_list})
+    # Build a weekly schedule (next 7 days, 8am-8pm) to display as calendar
+    # slots.  The hours are set by ``_SLOT_HOURS``.
+    week, availability = _week_grid(property_id)
     return render_template(
         "property_detail.html",
         property=prop,
@@ -2933,11 +3655,37 @@ def ui_property_detail(property_id: str) -> Any:
         packages=property_packages,
         shares=property_shares,
         files=files,
-        week_slots=week_slots,
+        week=week,
+        availability=availability,
         blocks=blocked_times.get(property_id, []),
     )
 
 
+# Placeholder used to build the property detail URL once; characters the
+# routing converter leaves unescaped in path segments are kept as is.
+_PID_PLACEHOLDER = "__PID__"
+_URL_SEGMENT_SAFE = "!$&'()*+,/:;=@"
+
+
+@lru_cache(maxsize=None)
+def _property_detail_parts() -> Tuple[str, str]:
+    """Split the built ``ui_property_detail`` path around the property ID."""
+    path = app.url_map.bind("").build("ui_property_detail", {"property_id": _PID_PLACEHOLDER})
+    prefix, suffix = path.split(_PID_PLACEHOLDER)
+    return prefix, suffix
+
+
+def _property_detail_url(property_id: str) -> str:
+    """
+    Return the URL of a property's detail page for use in redirects.
+
+    Equivalent to ``url_for("ui_property_detail", property_id=...)`` but the
+    route is only looked up once; later calls just splice in the ID.
+    """
+    prefix, suffix = _property_detail_parts()
+    return request.script_root + prefix + quote(property_id, safe=_URL_SEGMENT_SAFE) + suffix
+
+
 # -----------------------------------------------------------------------------
 # UI route for adding blocked times
 
@@ -2961,20 +3709,13 @@ def ui_add_block_time(property_id: str) -> Any:
         end_dt = datetime.fromisoformat(end_str)
     except Exception:
         # Invalid inputs; just redirect back
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     if end_dt <= start_dt:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     # Check overlap with existing blocks
-    overlaps = False
-    for b_start, b_end in blocked_times.get(property_id, []):
-        if start_dt < b_end and end_dt > b_start:
-            overlaps = True
-            break
-    if not overlaps:
-        blocked_times.setdefault(property_id, []).append((start_dt, end_dt))
-        # Optionally sort blocked ranges for easier reading
-        blocked_times[property_id].sort(key=lambda x: x[0])
-    return redirect(url_for("ui_property_detail", property_id=property_id))
+    if not is_time_blocked(property_id, start_dt, end_dt):
+        _add_block(property_id, start_dt, end_dt)
+    return redirect(_property_detail_url(property_id))
 
 
 @app.route("/properties/<property_id>/schedule_showing", methods=["POST"])
@@ -2990,120 +3731,110 @@ def ui_schedule_showing(property_id: str) -> Any:
     client_phone = request.form.get("client_phone")
     client_email = request.form.get("client_email")
     if not client_name or not scheduled_at:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     # call underlying showing_list POST logic directly
     # convert to JSON-like data and reuse existing function
     # create new showing id
     try:
         start = datetime.fromisoformat(scheduled_at)
     except Exception:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     end = start + timedelta(hours=1)
-    # Check conflict
-    if is_time_blocked(property_id, start, end) or has_conflict(property_id, start, end):
-        # Could set flash message; skip for simplicity
-        return redirect(url_for("ui_property_detail", property_id=property_id))
-    showing_id = str(uuid.uuid4())
-    showings[showing_id] = {
-        "id": showing_id,
-        "property_id": property_id,
-        "client_name": client_name,
-        "client_phone": client_phone,
-        "client_email": client_email,
-        "scheduled_at": start,
-        "status": "pending",
-        "lockbox_code": None,
-        "code_expires_at": None,
-        "created_at": datetime.utcnow(),
-    }
+    # Check conflicts and claim the slot atomically
+    with _prop_locks[property_id]:
+        if is_time_blocked(property_id, start, end) or has_conflict(property_id, start, end):
+            # Could set flash message; skip for simplicity
+            return redirect(_property_detail_url(property_id))
+        showing_id = uuid.uuid4().hex
+        s = {
+            "id": showing_id,
+            "property_id": property_id,
+            "client_name": client_name,
+            "client_phone": client_phone,
+            "client_email": client_email,
+            "scheduled_at": start,
+            "status": "pending",
+            "lockbox_code": None,
+            "code_expires_at": None,
+            "created_at": datetime.utcnow(),
+        }
+        # Auto‑approve before persisting so the row is written once in its final
+        # state rather than inserted as pending and then updated
+        auto = bool(prop.get("auto_approve_showings"))
+        if auto:
+            s["lockbox_code"] = generate_lockbox_code()
+            s["code_expires_at"] = start + timedelta(hours=1, minutes=15)
+            s["status"] = "approved"
+        _add_showing(s)
     # Persist the showing to the database
-    db_showing = ShowingModel(
-        id=showing_id,
-        property_id=property_id,
-        client_name=client_name,
-        client_phone=client_phone,
-        client_email=client_email,
-        scheduled_at=start,
-        status="pending",
-        lockbox_code=None,
-        code_expires_at=None,
-        created_at=datetime.utcnow(),
-    )
+    db_showing = _showing_model(s)
+    db_showing.created_at = s["created_at"]
     db.session.add(db_showing)
     db.session.commit()
-    # send notifications and log event (reuse code from API)
+    # send notifications and log event (reuse code from API).  Messages are
+    # collected into one SMS and one email batch and queued together at the
+    # end, so the redirect does not wait on Twilio or SMTP.
+    sms: List[Tuple[str, str]] = []
+    emails: List[Tuple[str, str, str]] = []
     try:
+        # Values shared by every message below
+        name = prop["name"]
+        when = start.strftime(_WHEN_FORMAT)
         # notify buyer
         if client_phone:
-            send_sms(client_phone, f"Your showing request for {prop['name']} on {start.strftime('%Y-%m-%d %H:%M')} has been received and is pending approval.")
+            sms.append((client_phone, _SMS_REQUEST_RECEIVED(prop=name, when=when)))
         if client_email:
-            send_email(
+            emails.append((
                 client_email,
                 "Showing request received",
-                f"Hello {client_name},\n\nYour showing request for {prop['name']} on {start.strftime('%Y-%m-%d %H:%M')} has been received and is pending approval.\n\nThank you."
-            )
+                _EMAIL_REQUEST_RECEIVED(name=client_name, prop=name, when=when),
+            ))
         # notify seller/agent
-        msg = (
-            f"New showing request for {prop['name']}: {client_name} has requested to view the property on {start.strftime('%Y-%m-%d %H:%M')}.\n"
-            f"Use your dashboard or the API to approve, decline or reschedule this showing.\n"
-            f"Showing ID: {showing_id}"
-        )
-        subj = f"New showing request for {prop['name']}"
-        if prop.get("seller_phone"):
-            send_sms(prop.get("seller_phone"), msg)
-        if prop.get("seller_email"):
-            send_email(prop.get("seller_email"), subj, msg)
-        if prop.get("agent_phone"):
-            send_sms(prop.get("agent_phone"), msg)
-        if prop.get("agent_email"):
-            send_email(prop.get("agent_email"), subj, msg)
+        msg = _NOTIFY_REQUESTED(prop=name, name=client_name, when=when, showing_id=showing_id)
+        subj = _prop_subject(property_id, _SUBJ_REQUESTED)
+        contact_sms, contact_emails = _stakeholder_batch(prop, subj, msg)
+        sms += contact_sms
+        emails += contact_emails
         # log event
+        start_iso = start.isoformat()
         log_event(property_id, "showing_requested", {
             "showing_id": showing_id,
             "client_name": client_name,
-            "scheduled_at": start.isoformat(),
+            "scheduled_at": start_iso,
         })
-        # auto approve if configured
-        if prop.get("auto_approve_showings"):
-            s = showings[showing_id]
-            code = generate_lockbox_code()
-            s["lockbox_code"] = code
-            s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
-            s["status"] = "approved"
+        # notify about the auto approval
+        if auto:
             # notify buyer
-            when2 = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-            code_str = s["lockbox_code"]
-            expires_str = s["code_expires_at"].strftime("%Y-%m-%d %H:%M")
-            if s.get("client_phone"):
-                send_sms(s.get("client_phone"), f"Your showing for {prop['name']} at {when2} has been approved. Lockbox code: {code_str} (expires {expires_str}).")
-            if s.get("client_email"):
-                send_email(s.get("client_email"), "Showing approved", f"Hello {s['client_name']},\n\nYour showing for {prop['name']} at {when2} has been approved.\nYour lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you.")
+            code = s["lockbox_code"]
+            expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
+            if client_phone:
+                sms.append((client_phone, _SMS_APPROVED(prop=name, when=when, code=code, exp=expires)))
+            if client_email:
+                emails.append((
+                    client_email,
+                    "Showing approved",
+                    _EMAIL_APPROVED(name=client_name, prop=name, when=when, code=code, exp=expires),
+                ))
             # notify property contacts of auto approval
-            notif_msg = (
-                f"Showing for {prop['name']} on {when2} was automatically approved.\n"
-                f"Buyer: {s['client_name']}. Lockbox code: {code_str} (expires {expires_str}).\n"
-                f"Showing ID: {showing_id}"
+            notif_msg = _NOTIFY_AUTO_APPROVED(
+                prop=name, when=when, name=client_name, code=code, exp=expires, showing_id=showing_id
             )
-            notif_subj = f"Showing auto‑approved for {prop['name']}"
-            if prop.get("seller_phone"):
-                send_sms(prop.get("seller_phone"), notif_msg)
-            if prop.get("seller_email"):
-                send_email(prop.get("seller_email"), notif_subj, notif_msg)
-            if prop.get("agent_phone"):
-                send_sms(prop.get("agent_phone"), notif_msg)
-            if prop.get("agent_email"):
-                send_email(prop.get("agent_email"), notif_subj, notif_msg)
+            notif_subj = _prop_subject(property_id, _SUBJ_AUTO_APPROVED)
+            contact_sms, contact_emails = _stakeholder_batch(prop, notif_subj, notif_msg)
+            sms += contact_sms
+            emails += contact_emails
             # log approval
             log_event(property_id, "showing_approved", {
                 "showing_id": showing_id,
-                "client_name": s["client_name"],
-                "scheduled_at": s["scheduled_at"].isoformat(),
-                "lockbox_code": s["lockbox_code"],
+                "client_name": client_name,
+                "scheduled_at": start_iso,
+                "lockbox_code": code,
                 "auto": True,
             })
     except Exception:
         pass
-    return redirect(url_for("ui_property_detail", property_id=property_id))
+    notify_bulk(sms, emails)
+    return redirect(_property_detail_url(property_id))
 
 # -----------------------------------------------------------------------------
 # UI endpoint for scheduling a showing via a specific time slot
@@ -3121,7 +3852,7 @@ def ui_schedule_slot(property_id: str, scheduled_at: str) -> Any:
     try:
         slot_dt = datetime.fromisoformat(scheduled_at)
     except Exception:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     if request.method == "POST":
         client_name = request.form.get("client_name")
         client_phone = request.form.get("client_phone")
@@ -3134,64 +3865,95 @@ def ui_schedule_slot(property_id: str, scheduled_at: str) -> Any:
                 scheduled_at=scheduled_at,
                 error="Client name is required",
             )
-        # Check availability (re-use conflict logic)
         start = slot_dt
         end = start + timedelta(hours=1)
-        if is_time_blocked(property_id, start, end) or has_conflict(property_id, start, end):
-            return render_template(
-                "schedule_slot.html",
-                property=prop,
-                property_id=property_id,
-                scheduled_at=scheduled_at,
-                error="This slot is no longer available",
-            )
-        # Create showing
-        showing_id = str(uuid.uuid4())
-        showings[showing_id] = {
-            "id": showing_id,
-            "property_id": property_id,
-            "scheduled_at": scheduled_at,
-            "status": "pending",
-            "client_name": client_name,
-            "client_phone": client_phone,
-            "client_email": client_email,
-        }
-        # Notify buyer and property contacts
-        buyer_msg = f"Your showing request for {prop['name']} on {slot_dt.strftime('%Y-%m-%d %I:%M %p')} has been received and is pending approval."
+        # Check availability (re-use conflict logic) and claim the slot atomically
+        with _prop_locks[property_id]:
+            if is_time_blocked(property_id, start, end) or has_conflict(property_id, start, end):
+                return render_template(
+                    "schedule_slot.html",
+                    property=prop,
+                    property_id=property_id,
+                    scheduled_at=scheduled_at,
+                    error="This slot is no longer available",
+                )
+            # Create showing, already approved with a lockbox code if the
+            # property auto‑approves, so the row is written once in its final state
+            showing_id = uuid.uuid4().hex
+            s = {
+                "id": showing_id,
+                "property_id": property_id,
+                "scheduled_at": slot_dt,
+                "status": "pending",
+                "client_name": client_name,
+                "client_phone": client_phone,
+                "client_email": client_email,
+            }
+            auto = bool(prop.get("auto_approve_showings"))
+            if auto:
+                code = generate_lockbox_code()
+                expires = slot_dt + timedelta(hours=1, minutes=15)
+                s["lockbox_code"] = code
+                s["code_expires_at"] = expires
+                s["status"] = "approved"
+            _add_showing(s)
+        # Persist to DB
+        db.session.add(_showing_model(s))
+        db.session.commit()
+        # Notify buyer and property contacts.  Messages are collected into one
+        # SMS and one email batch and queued together before redirecting.
+        sms: List[Tuple[str, str]] = []
+        emails: List[Tuple[str, str, str]] = []
+        name = prop["name"]
+        when = slot_dt.strftime(_WHEN_FORMAT)
         if client_phone:
-            send_sms(client_phone, buyer_msg)
+            sms.append((client_phone, _SMS_REQUEST_RECEIVED(prop=name, when=when)))
         if client_email:
-            send_email(client_email, "Showing request received", buyer_msg)
+            emails.append((
+                client_email,
+                "Showing request received",
+                _EMAIL_REQUEST_RECEIVED(name=client_name, prop=name, when=when),
+            ))
         # Notify seller/agent
-        contact_msg = f"New showing request for {prop['name']} at {slot_dt.strftime('%Y-%m-%d %I:%M %p')} from {client_name}."
-        for contact in [prop.get("seller_phone"), prop.get("agent_phone")]:
-            if contact:
-                send_sms(contact, contact_msg)
-        for contact in [prop.get("seller_email"), prop.get("agent_email")]:
-            if contact:
-                send_email(contact, "New showing request", contact_msg)
-        log_event("showing_requested", property_id, showing_id, details={"client_name": client_name})
-        # Auto-approve if property has auto_approve_showings
-        if prop.get("auto_approve_showings"):
-            showings[showing_id]["status"] = "approved"
-            code, expires = generate_lockbox_code(showing_id)
-            showings[showing_id]["code"] = code
-            showings[showing_id]["expires_at"] = expires.isoformat()
-            log_event("showing_approved", property_id, showing_id)
+        contact_msg = _NOTIFY_REQUESTED(prop=name, name=client_name, when=when, showing_id=showing_id)
+        contact_sms, contact_emails = _stakeholder_batch(prop, _prop_subject(property_id, _SUBJ_REQUESTED), contact_msg)
+        sms += contact_sms
+        emails += contact_emails
+        log_event(property_id, "showing_requested", {
+            "showing_id": showing_id,
+            "client_name": client_name,
+            "scheduled_at": slot_dt.isoformat(),
+        })
+        # Log and notify the auto approval
+        if auto:
+            log_event(property_id, "showing_approved", {
+                "showing_id": showing_id,
+                "client_name": client_name,
+                "scheduled_at": slot_dt.isoformat(),
+                "lockbox_code": code,
+                "auto": True,
+            })
             # Notify buyer with lockbox code
-            approval_msg = f"Your showing at {prop['name']} on {slot_dt.strftime('%Y-%m-%d %I:%M %p')} has been approved.\nLockbox code: {code} (expires {expires.strftime('%Y-%m-%d %I:%M %p')})."
+            exp = expires.strftime(_WHEN_FORMAT)
             if client_phone:
-                send_sms(client_phone, approval_msg)
+                sms.append((client_phone, _SMS_APPROVED(prop=name, when=when, code=code, exp=exp)))
             if client_email:
-                send_email(client_email, "Showing approved", approval_msg)
+                emails.append((
+                    client_email,
+                    "Showing approved",
+                    _EMAIL_APPROVED(name=client_name, prop=name, when=when, code=code, exp=exp),
+                ))
             # Notify seller/agent
-            for contact in [prop.get("seller_phone"), prop.get("agent_phone")]:
-                if contact:
-                    send_sms(contact, approval_msg)
-            for contact in [prop.get("seller_email"), prop.get("agent_email")]:
-                if contact:
-                    send_email(contact, "Showing auto-approved", approval_msg)
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+            contact_msg = _NOTIFY_AUTO_APPROVED(
+                prop=name, when=when, name=client_name, code=code, exp=exp, showing_id=showing_id
+            )
+            contact_sms, contact_emails = _stakeholder_batch(
+                prop, _prop_subject(property_id, _SUBJ_AUTO_APPROVED), contact_msg
+            )
+            sms += contact_sms
+            emails += contact_emails
+        notify_bulk(sms, emails)
+        return redirect(_property_detail_url(property_id))
     # GET: show schedule form
     return render_template(
         "schedule_slot.html",
@@ -3208,49 +3970,52 @@ def ui_approve_showing(showing_id: str) -> Any:
     if not s:
         return "Showing not found", 404
     prop_id = s["property_id"]
-    # reuse approval logic
-    if s["status"] == "pending":
-        code = generate_lockbox_code()
-        s["lockbox_code"] = code
-        s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
-        s["status"] = "approved"
+    # reuse approval logic; the status test and write happen under the
+    # property lock so a concurrent approve or decline cannot interleave
+    approved = False
+    with _prop_locks[prop_id]:
+        if s["status"] == "pending":
+            code = generate_lockbox_code()
+            s["lockbox_code"] = code
+            s["code_expires_at"] = s["scheduled_at"] + timedelta(hours=1, minutes=15)
+            s["status"] = "approved"
+            _showings_changed()
+            approved = True
+    if approved:
         # send notifications
         try:
             prop = properties.get(prop_id)
             prop_name = prop.get("name") if prop else prop_id
-            when = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
-            code_str = s["lockbox_code"]
-            expires_str = s["code_expires_at"].strftime("%Y-%m-%d %H:%M")
+            when = s["scheduled_at"].strftime(_WHEN_FORMAT)
+            expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
             # buyer
+            sms: List[Tuple[str, str]] = []
+            emails: List[Tuple[str, str, str]] = []
             if s.get("client_phone"):
-                send_sms(s.get("client_phone"), f"Your showing for {prop_name} at {when} has been approved. Lockbox code: {code_str} (expires {expires_str}).")
+                sms.append((s["client_phone"], _SMS_APPROVED(prop=prop_name, when=when, code=code, exp=expires)))
             if s.get("client_email"):
-                send_email(s.get("client_email"), "Showing approved", f"Hello {s['client_name']},\n\nYour showing for {prop_name} at {when} has been approved.\nYour lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you.")
+                emails.append((
+                    s["client_email"],
+                    "Showing approved",
+                    _EMAIL_APPROVED(name=s["client_name"], prop=prop_name, when=when, code=code, exp=expires),
+                ))
             # seller/agent
-            msg_notify = (
-                f"Showing for {prop_name} on {when} has been approved.\n"
-                f"Buyer: {s['client_name']}. Lockbox code: {code_str} (expires {expires_str}).\n"
-                f"Showing ID: {showing_id}"
+            msg_notify = _NOTIFY_APPROVED(
+                prop=prop_name, when=when, name=s["client_name"], code=code, exp=expires, showing_id=showing_id
             )
-            subj_notify = f"Showing approved for {prop_name}"
-            if prop.get("seller_phone"):
-                send_sms(prop.get("seller_phone"), msg_notify)
-            if prop.get("seller_email"):
-                send_email(prop.get("seller_email"), subj_notify, msg_notify)
-            if prop.get("agent_phone"):
-                send_sms(prop.get("agent_phone"), msg_notify)
-            if prop.get("agent_email"):
-                send_email(prop.get("agent_email"), subj_notify, msg_notify)
+            subj_notify = _prop_subject(prop_id, _SUBJ_APPROVED)
+            contact_sms, contact_emails = _stakeholder_batch(prop, subj_notify, msg_notify)
+            notify_bulk(sms + contact_sms, emails + contact_emails)
             # log event
             log_event(prop_id, "showing_approved", {
                 "showing_id": showing_id,
                 "client_name": s["client_name"],
                 "scheduled_at": s["scheduled_at"].isoformat(),
-                "lockbox_code": s["lockbox_code"],
+                "lockbox_code": code,
             })
         except Exception:
             pass
-    return redirect(url_for("ui_property_detail", property_id=prop_id))
+    return redirect(_property_detail_url(prop_id))
 
 
 @app.route("/showings/<showing_id>/decline_ui", methods=["POST"])
@@ -3260,31 +4025,33 @@ def ui_decline_showing(showing_id: str) -> Any:
     if not s:
         return "Showing not found", 404
     prop_id = s["property_id"]
-    if s["status"] == "pending":
-        s["status"] = "declined"
+    declined = False
+    with _prop_locks[prop_id]:
+        if s["status"] == "pending":
+            s["status"] = "declined"
+            _showings_changed()
+            declined = True
+    if declined:
         try:
             prop = properties.get(prop_id)
             prop_name = prop.get("name") if prop else prop_id
-            when = s["scheduled_at"].strftime("%Y-%m-%d %H:%M")
+            when = s["scheduled_at"].strftime(_WHEN_FORMAT)
             # notify buyer
+            sms: List[Tuple[str, str]] = []
+            emails: List[Tuple[str, str, str]] = []
             if s.get("client_phone"):
-                send_sms(s.get("client_phone"), f"Your showing request for {prop_name} on {when} has been declined.")
+                sms.append((s["client_phone"], _SMS_DECLINED(prop=prop_name, when=when)))
             if s.get("client_email"):
-                send_email(s.get("client_email"), "Showing declined", f"Hello {s['client_name']},\n\nYour showing request for {prop_name} on {when} has been declined.\n\nThank you.")
+                emails.append((
+                    s["client_email"],
+                    "Showing declined",
+                    _EMAIL_DECLINED(name=s["client_name"], prop=prop_name, when=when),
+                ))
             # notify seller/agent
-            msg_notify = (
-                f"Showing for {prop_name} on {when} has been declined.\n"
-                f"Buyer: {s['client_name']}. Showing ID: {showing_id}"
-            )
-            subj_notify = f"Showing declined for {prop_name}"
-            if prop.get("seller_phone"):
-                send_sms(prop.get("seller_phone"), msg_notify)
-            if prop.get("seller_email"):
-                send_email(prop.get("seller_email"), subj_notify, msg_notify)
-            if prop.get("agent_phone"):
-                send_sms(prop.get("agent_phone"), msg_notify)
-            if prop.get("agent_email"):
-                send_email(prop.get("agent_email"), subj_notify, msg_notify)
+            msg_notify = _NOTIFY_DECLINED(prop=prop_name, when=when, name=s["client_name"], showing_id=showing_id)
+            subj_notify = _prop_subject(prop_id, _SUBJ_DECLINED)
+            contact_sms, contact_emails = _stakeholder_batch(prop, subj_notify, msg_notify)
+            notify_bulk(sms + contact_sms, emails + contact_emails)
             # log decline
             log_event(prop_id, "showing_declined", {
                 "showing_id": showing_id,
@@ -3293,7 +4060,7 @@ def ui_decline_showing(showing_id: str) -> Any:
             })
         except Exception:
             pass
-    return redirect(url_for("ui_property_detail", property_id=prop_id))
+    return redirect(_property_detail_url(prop_id))
 
 
 @app.route("/showings/<showing_id>/reschedule_ui", methods=["POST"])
@@ -3305,51 +4072,46 @@ def ui_reschedule_showing(showing_id: str) -> Any:
     prop_id = s["property_id"]
     new_time = request.form.get("new_time")
     if not new_time:
-        return redirect(url_for("ui_property_detail", property_id=prop_id))
+        return redirect(_property_detail_url(prop_id))
     try:
         start = datetime.fromisoformat(new_time)
     except Exception:
-        return redirect(url_for("ui_property_detail", property_id=prop_id))
+        return redirect(_property_detail_url(prop_id))
     end = start + timedelta(hours=1)
-    if is_time_blocked(prop_id, start, end) or has_conflict(prop_id, start, end):
-        return redirect(url_for("ui_property_detail", property_id=prop_id))
-    s["scheduled_at"] = start
-    regenerated = False
-    if s["status"] == "approved":
-        s["lockbox_code"] = generate_lockbox_code()
-        s["code_expires_at"] = start + timedelta(hours=1, minutes=15)
-        regenerated = True
+    # Check conflicts and move the showing atomically
+    with _prop_locks[prop_id]:
+        if is_time_blocked(prop_id, start, end) or has_conflict(prop_id, start, end):
+            return redirect(_property_detail_url(prop_id))
+        _move_showing(s, start)
+        regenerated = False
+        if s["status"] == "approved":
+            s["lockbox_code"] = generate_lockbox_code()
+            s["code_expires_at"] = start + timedelta(hours=1, minutes=15)
+            regenerated = True
     # send notifications
     try:
         prop = properties.get(prop_id)
         prop_name = prop.get("name") if prop else prop_id
-        when_str = start.strftime("%Y-%m-%d %H:%M")
+        when = start.strftime(_WHEN_FORMAT)
         if regenerated:
-            code_str = s["lockbox_code"]
-            expires_str = s["code_expires_at"].strftime("%Y-%m-%d %H:%M") if s.get("code_expires_at") else ""
-            sms_msg = f"Your showing for {prop_name} has been rescheduled to {when_str}. New lockbox code: {code_str} (expires {expires_str})."
-            email_body = f"Hello {s['client_name']},\n\nYour showing for {prop_name} has been rescheduled to {when_str}.\nYour new lockbox code is {code_str} and will expire at {expires_str}.\n\nThank you."
+            code = s["lockbox_code"]
+            expires = s["code_expires_at"].strftime(_WHEN_FORMAT)
+            sms_msg = _SMS_RESCHEDULED_CODE(prop=prop_name, when=when, code=code, exp=expires)
+            email_body = _EMAIL_RESCHEDULED_CODE(name=s["client_name"], prop=prop_name, when=when, code=code, exp=expires)
         else:
-            sms_msg = f"Your showing request for {prop_name} has been rescheduled to {when_str} and is pending approval."
-            email_body = f"Hello {s['client_name']},\n\nYour showing request for {prop_name} has been rescheduled to {when_str} and is pending approval.\n\nThank you."
+            sms_msg = _SMS_RESCHEDULED_PENDING(prop=prop_name, when=when)
+            email_body = _EMAIL_RESCHEDULED_PENDING(name=s["client_name"], prop=prop_name, when=when)
+        sms: List[Tuple[str, str]] = []
+        emails: List[Tuple[str, str, str]] = []
         if s.get("client_phone"):
-            send_sms(s.get("client_phone"), sms_msg)
+            sms.append((s["client_phone"], sms_msg))
         if s.get("client_email"):
-            send_email(s.get("client_email"), "Showing rescheduled", email_body)
+            emails.append((s["client_email"], "Showing rescheduled", email_body))
         # notify seller/agent
-        msg_notify = (
-            f"Showing for {prop_name} has been rescheduled to {when_str}.\n"
-            f"Buyer: {s['client_name']}. Showing ID: {showing_id}"
-        )
-        subj_notify = f"Showing rescheduled for {prop_name}"
-        if prop.get("seller_phone"):
-            send_sms(prop.get("seller_phone"), msg_notify)
-        if prop.get("seller_email"):
-            send_email(prop.get("seller_email"), subj_notify, msg_notify)
-        if prop.get("agent_phone"):
-            send_sms(prop.get("agent_phone"), msg_notify)
-        if prop.get("agent_email"):
-            send_email(prop.get("agent_email"), subj_notify, msg_notify)
+        msg_notify = _NOTIFY_RESCHEDULED(prop=prop_name, when=when, name=s["client_name"], showing_id=showing_id)
+        subj_notify = _prop_subject(prop_id, _SUBJ_RESCHEDULED)
+        contact_sms, contact_emails = _stakeholder_batch(prop, subj_notify, msg_notify)
+        notify_bulk(sms + contact_sms, emails + contact_emails)
         # log event
         log_event(prop_id, "showing_rescheduled", {
             "showing_id": showing_id,
@@ -3358,7 +4120,7 @@ def ui_reschedule_showing(showing_id: str) -> Any:
         })
     except Exception:
         pass
-    return redirect(url_for("ui_property_detail", property_id=prop_id))
+    return redirect(_property_detail_url(prop_id))
 
 
 # UI helpers for disclosures and packages
@@ -3373,22 +4135,20 @@ def ui_create_package(property_id: str) -> Any:
     files_list = [f.strip() for f in files_field.split(",") if f.strip()]
     is_public = bool(request.form.get("is_public"))
     if not name or not files_list:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     # validate that files exist
-    prop_files = disclosures.get(property_id, {})
-    for fn in files_list:
-        safe_fn = secure_filename(fn)
-        if safe_fn not in prop_files:
-            return redirect(url_for("ui_property_detail", property_id=property_id))
-    pkg_id = str(uuid.uuid4())
-    packages[pkg_id] = {
+    safe_files = [_secure(fn) for fn in files_list]
+    if not disclosures.get(property_id, {}).keys() >= set(safe_files):
+        return redirect(_property_detail_url(property_id))
+    pkg_id = uuid.uuid4().hex
+    _add_package({
         "id": pkg_id,
         "property_id": property_id,
         "name": name,
-        "files": [secure_filename(fn) for fn in files_list],
+        "files": safe_files,
         "is_public": is_public,
         "created_at": datetime.utcnow().isoformat(),
-    }
+    })
     # log event
     try:
         log_event(property_id, "package_created", {
@@ -3399,7 +4159,7 @@ def ui_create_package(property_id: str) -> Any:
         })
     except Exception:
         pass
-    return redirect(url_for("ui_property_detail", property_id=property_id))
+    return redirect(_property_detail_url(property_id))
 
 
 @app.route("/properties/<property_id>/request_disclosure_ui", methods=["POST"])
@@ -3413,14 +4173,14 @@ def ui_request_disclosure(property_id: str) -> Any:
     buyer_phone = request.form.get("buyer_phone")
     buyer_email = request.form.get("buyer_email")
     if not package_id or not buyer_name:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     pkg = packages.get(package_id)
     if not pkg or pkg.get("property_id") != property_id:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
+        return redirect(_property_detail_url(property_id))
     # Determine auto approval
     auto = not prop.get("requires_disclosure_approval")
-    share_id = str(uuid.uuid4())
-    package_shares[share_id] = {
+    share_id = uuid.uuid4().hex
+    _add_share({
         "id": share_id,
         "package_id": package_id,
         "property_id": property_id,
@@ -3429,7 +4189,7 @@ def ui_request_disclosure(property_id: str) -> Any:
         "buyer_email": buyer_email,
         "downloads": [],
         "approved": auto,
-    }
+    })
     # log event
     try:
         log_event(property_id, "disclosure_requested", {
@@ -3440,54 +4200,37 @@ def ui_request_disclosure(property_id: str) -> Any:
         })
     except Exception:
         pass
-    # notify seller/agent
+    # notify seller/agent.  Messages are collected into one SMS and one email
+    # batch and queued together before redirecting.
+    sms: List[Tuple[str, str]] = []
+    emails: List[Tuple[str, str, str]] = []
+    prop_name = prop.get("name", property_id)
     try:
-        prop_name = prop.get("name", property_id)
-        seller_phone = prop.get("seller_phone")
-        seller_email = prop.get("seller_email")
-        agent_phone = prop.get("agent_phone")
-        agent_email = prop.get("agent_email")
         if auto:
-            msg = (
-                f"Disclosure package '{pkg['name']}' for {prop_name} was automatically shared with buyer {buyer_name}. (Share ID: {share_id})"
-            )
-            subj = f"Disclosure package shared for {prop_name}"
+            msg = _NOTIFY_SHARE_AUTO(pkg=pkg["name"], prop=prop_name, buyer=buyer_name, share_id=share_id)
+            subj = _SUBJ_SHARE_AUTO(prop=prop_name)
         else:
-            msg = (
-                f"Buyer {buyer_name} has requested access to disclosure package '{pkg['name']}' for {prop_name}.\n"
-                f"Approve the share via POST /share/{share_id}/approve."
-            )
-            subj = f"Disclosure access request for {prop_name}"
-        if seller_phone:
-            send_sms(seller_phone, msg)
-        if seller_email:
-            send_email(seller_email, subj, msg)
-        if agent_phone:
-            send_sms(agent_phone, msg)
-        if agent_email:
-            send_email(agent_email, subj, msg)
+            msg = _NOTIFY_SHARE_REQUESTED(buyer=buyer_name, pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            subj = _SUBJ_SHARE_REQUESTED(prop=prop_name)
+        sms, emails = _stakeholder_batch(prop, subj, msg)
     except Exception:
         pass
     # notify buyer
     try:
-        prop_name = prop.get("name", property_id)
         if auto:
-            buyer_msg = (
-                f"You have been granted access to disclosure package '{pkg['name']}' for {prop_name}.\nUse your share ID {share_id} to download the files."
-            )
-            buyer_subj = f"Disclosure package available for {prop_name}"
+            buyer_msg = _BUYER_SHARE_GRANTED(pkg=pkg["name"], prop=prop_name, share_id=share_id)
+            buyer_subj = _BUYER_SUBJ_SHARE_GRANTED(prop=prop_name)
         else:
-            buyer_msg = (
-                f"Your request to access disclosure package '{pkg['name']}' for {prop_name} has been received and is pending approval.\nYou will be notified when access is granted."
-            )
-            buyer_subj = f"Disclosure access request received for {prop_name}"
+            buyer_msg = _BUYER_SHARE_PENDING(pkg=pkg["name"], prop=prop_name)
+            buyer_subj = _BUYER_SUBJ_SHARE_PENDING(prop=prop_name)
         if buyer_phone:
-            send_sms(buyer_phone, buyer_msg)
+            sms.append((buyer_phone, buyer_msg))
         if buyer_email:
-            send_email(buyer_email, buyer_subj, buyer_msg)
+            emails.append((buyer_email, buyer_subj, buyer_msg))
     except Exception:
         pass
-    return redirect(url_for("ui_property_detail", property_id=property_id))
+    notify_bulk(sms, emails)
+    return redirect(_property_detail_url(property_id))
 
 
 @app.route("/properties/<property_id>/upload_disclosure_ui", methods=["POST"])
@@ -3497,18 +4240,17 @@ def ui_upload_disclosure(property_id: str) -> Any:
         return "Property not found", 404
     file = request.files.get("file")
     if not file:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
-    filename = secure_filename(file.filename or "")
+        return redirect(_property_detail_url(property_id))
+    filename = _secure(file.filename or "")
     if not filename:
-        return redirect(url_for("ui_property_detail", property_id=property_id))
-    data_bytes = file.read()
-    disclosures.setdefault(property_id, {})[filename] = data_bytes
+        return redirect(_property_detail_url(property_id))
+    save_disclosure(property_id, filename, file)
     # log upload event
     try:
         log_event(property_id, "upload_disclosure", {"filename": filename})
     except Exception:
         pass
-    return redirect(url_for("ui_property_detail", property_id=property_id))
+    return redirect(_property_detail_url(property_id))
 
 
 @app.route("/share/<share_id>/approve_ui", methods=["POST"])
@@ -3518,8 +4260,7 @@ def ui_approve_share(share_id: str) -> Any:
     if not share:
         return "Share not found", 404
     prop_id = share.get("property_id")
-    if not share.get("approved"):
-        share["approved"] = True
+    if _claim_share_approval(share):
         # log event
         try:
             log_event(prop_id, "share_approved", {"share_id": share_id, "buyer_name": share.get("buyer_name")})
@@ -3531,56 +4272,33 @@ def ui_approve_share(share_id: str) -> Any:
             prop_name = prop.get("name", prop_id)
             buyer_phone = share.get("buyer_phone")
             buyer_email = share.get("buyer_email")
-            buyer_msg = (
-                f"Your request to access disclosure package for {prop_name} has been approved.\nUse your share ID {share_id} to download the files."
-            )
-            buyer_subj = f"Disclosure package approved for {prop_name}"
-            if buyer_phone:
-                send_sms(buyer_phone, buyer_msg)
-            if buyer_email:
-                send_email(buyer_email, buyer_subj, buyer_msg)
+            buyer_msg = _BUYER_SHARE_APPROVED(prop=prop_name, share_id=share_id)
+            buyer_subj = _BUYER_SUBJ_SHARE_APPROVED(prop=prop_name)
+            _notify_buyer(buyer_phone, buyer_email, buyer_subj, buyer_msg)
         except Exception:
             pass
-    return redirect(url_for("ui_property_detail", property_id=prop_id))
+    return redirect(_property_detail_url(prop_id))
 
 # Only run the development server if this module is executed directly.
 if __name__ == "__main__":
     """
     When executed directly, initialize the database schema and run the development server.
 
-    This block also performs a simple schema migration check: if the existing SQLite
-    database is missing the `role` column on the `user` table (introduced in
-    later versions of the app), it will drop all tables and recreate them with
-    the current schema. This destructive operation is intended for development
-    environments only. For production use, integrate a proper migration tool
-    such as Flask-Migrate/Alembic.
+    Databases created by earlier versions of the app (for example without the
+    ``role`` or profile columns on the ``user`` table) are upgraded in place by
+    ``upgrade_schema``, so existing records are kept.
     """
     with app.app_context():
-        from sqlalchemy import inspect
-
-        inspector = inspect(db.engine)
-        # Attempt to retrieve column names for the user table. If the table
-        # doesn't exist yet, this will simply return an empty list.
-        try:
-            user_columns = [col["name"] for col in inspector.get_columns("user")]
-        except Exception:
-            user_columns = []
-        # If any of the expected User columns are missing, drop and recreate tables.
-        # This simple schema migration is only suitable for development.  In a
-        # production system, use Alembic or another migration tool.
-        required_user_columns = {"role", "email", "address", "license_number", "avatar_filename"}
-        missing_cols = required_user_columns.difference(set(user_columns))
-        if missing_cols:
-            db.drop_all()
-            print(
-                "Database schema outdated or missing columns {} on user table; dropping and "
-                "recreating all tables with the updated schema. All existing data "
-                "will be lost.".format(
-                    ", ".join(sorted(missing_cols))
-                )
-            )
-        db.create_all()
+        upgrade_schema()
         # Load any existing records into in-memory structures for the demo
         load_db_into_memory()
-    # Run the development server on port 3000 for demonstration purposes
-    app.run(host="0.0.0.0", port=3000, debug=True)
\ No newline at end of file
+    # Run the development server on port 3000 for demonstration purposes.
+    # The debugger and reloader are only enabled when FLASK_DEBUG=1; each
+    # request is served on its own thread so a slow upload or notification
+    # does not hold up other requests.
+    app.run(
+        host="0.0.0.0",
+        port=3000,
+        debug=os.environ.get("FLASK_DEBUG") == "1",
+        threaded=True,
+    )
\ No newline at end of file